@@ -30,9 +30,18 @@ APP_YEAR = '2023'
 APP_LICENSE = 'MIT'
 APP_WEBSITE = 'https://github.com/Erriez/midi-sysex-io'
 
-# Enable one of MIDI backends below (not multiple):
-USE_PYGAME = 0
-USE_RTMIDI = 1
+# MIDI backends in order of preference, selected with --backend or the MIDI menu and falls back to the next
+# available backend
+MIDI_BACKENDS = ['rtmidi', 'pygame']
 
 # SYSEX receive complete time (commandline --receive)
 MIDI_RX_COMPLETE_SEC = 2.0
+
+# SYSEX dump request reply timeout (commandline --request)
+MIDI_REQUEST_TIMEOUT_SEC = 10.0
+
+# Input must be quiet for this time before a dump request is sent, trailing messages of a previous reply are discarded
+MIDI_REQUEST_QUIET_SEC = 0.2
+
+# MIDI port hot-plug check interval in the GUI
+MIDI_PORT_WATCH_INTERVAL_SEC = 2.0
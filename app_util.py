@@ -0,0 +1,67 @@
+#
+# MIT License
+#
+# Copyright (c) 2023-2024 Erriez
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Source: https://github.com/Erriez/midi-sysex-io
+#
+
+from pathlib import Path
+import os
+
+# Path to data and images relative from this script directory
+# Used by running Python source and Nuitka deployment executable
+path_data = os.path.join(Path(__file__).resolve().parent, 'data')
+path_images = os.path.join(Path(__file__).resolve().parent, 'images')
+
+
+def get_app_version():
+    app_version = 'Unknown'
+    version_file = os.path.join(path_data, 'version.txt')
+    if version_file:
+        try:
+            with open(version_file, 'r') as f:
+                app_version = f.readline()
+        except OSError:
+            pass
+    return app_version.strip()
+
+
+def bytes_to_str(num_bytes):
+    if num_bytes < 1024:
+        msg = '{} Bytes'.format(num_bytes)
+    elif num_bytes < (1024 * 1024):
+        msg = '{:0.1f} kB'.format(num_bytes / 1024.0)
+    else:
+        msg = '{:0.1f} MB'.format(num_bytes / (1024.0 * 1024.0))
+    return msg
+
+
+def get_port_file_name(file_name, port_id):
+    # File name per MIDI port: file.syx -> file-port1.syx
+    base, ext = os.path.splitext(file_name)
+    return '{}-port{}{}'.format(base, port_id, ext or '.syx')
+
+
+def get_request_file_name(file_name, index):
+    # File name per dump request: file.syx -> file-request1.syx
+    base, ext = os.path.splitext(file_name)
+    return '{}-request{}{}'.format(base, index + 1, ext or '.syx')
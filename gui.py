@@ -0,0 +1,1324 @@
+#
+# MIT License
+#
+# Copyright (c) 2023-2024 Erriez
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Source: https://github.com/Erriez/midi-sysex-io
+#
+
+import PySide6
+from PySide6.QtWidgets import QApplication, QMainWindow, QDialog, QTextEdit, QProgressBar, QPushButton, QGridLayout,\
+    QLabel, QVBoxLayout, QFileDialog, QWidget, QComboBox, QHBoxLayout, QMessageBox, QSizePolicy, QGroupBox, QSpinBox,\
+    QDoubleSpinBox, QFormLayout, QDialogButtonBox, QCheckBox, QListWidget, QListWidgetItem
+from PySide6.QtCore import Qt, QSettings, QSize, QPoint, QThread, Signal
+from PySide6.QtGui import QAction, QActionGroup, QIcon, QFont
+from pathlib import Path
+import os
+import platform
+import sys
+import threading
+import webbrowser
+
+from app_config import *
+from app_util import bytes_to_str, get_app_version, get_port_file_name, path_images
+import hexview
+import messagebox
+import midi_backend
+import midi_util
+import sysex_devices
+import sysex_session
+
+if sys.platform == 'linux':
+    import distro
+
+
+class SysexTransmitThread(QThread):
+    transmit_bytes = Signal(int)
+    transmit_completed = Signal(bool)
+
+    def __init__(self, midi, sysex_buffer, adaptive_rate=None, adaptive_echo=False):
+        QThread.__init__(self)
+
+        self.sysex_buffer = sysex_buffer
+        self.adaptive_rate = adaptive_rate
+        self.adaptive_echo = adaptive_echo
+        self.session = sysex_session.SysexSession(midi)
+
+    def cancel(self):
+        self.session.cancel_token.cancel()
+
+    def run(self):
+        # Update GUI with number of transmitted Bytes
+        for result in self.session.iter_transmit(self.sysex_buffer, adaptive_rate=self.adaptive_rate,
+                                                 adaptive_echo=self.adaptive_echo):
+            self.transmit_bytes.emit(result.num_bytes)
+
+        # SYSEX transmit completed, failed or canceled
+        self.transmit_completed.emit(self.session.result.success)
+
+
+class MidiPortWatcher(QThread):
+    ports_changed = Signal(list, list)
+
+    def __init__(self, interval=MIDI_PORT_WATCH_INTERVAL_SEC):
+        QThread.__init__(self)
+
+        self.interval = interval
+        self._refresh = False
+        self._wakeup = threading.Event()
+        self._done = False
+
+    def refresh(self):
+        # Enumerate all ports again without waiting for the next interval
+        self._refresh = True
+        self._wakeup.set()
+
+    def stop(self):
+        self._done = True
+        self._wakeup.set()
+        self.wait()
+
+    def run(self):
+        # Separate MIDI object, enumeration never blocks the GUI thread
+        midi = midi_backend.MIDI()
+        ports = None
+        while not self._done:
+            # Clear before scanning, a refresh requested during the scan wakes up the next wait immediately
+            self._wakeup.clear()
+            refresh = self._refresh
+            self._refresh = False
+
+            # Port cache only enumerates again when the number of ports changed or is expired
+            new_ports = (midi.get_ports_in(refresh), midi.get_ports_out(refresh))
+            if new_ports != ports or refresh:
+                ports = new_ports
+                self.ports_changed.emit(*ports)
+
+            self._wakeup.wait(self.interval)
+
+
+class SysexTransmitWindow(QDialog):
+    def __init__(self, midi, sysex_buffer, adaptive_rate=None, adaptive_echo=False, parent=None):
+        super().__init__(parent)
+        self.parent = parent
+
+        self.midi = midi
+        self.sysex_buffer = sysex_buffer
+
+        self.setFixedWidth(210)
+        self.setFixedHeight(130)
+        self.setWindowTitle('SYSEX Transmit')
+
+        self.lbl_bytes_total = QLabel('Total: {}'.format(bytes_to_str(sysex_buffer.size)))
+        self.lbl_bytes_sent = QLabel('Sent: ')
+
+        self.progress = QProgressBar()
+        self.progress.setMinimum(0)
+        self.progress.setMaximum(100)
+
+        self.btn_cancel = QPushButton('Cancel')
+        self.btn_cancel.setFixedWidth(75)
+        self.btn_cancel.clicked.connect(self.on_btn_cancel)
+
+        grid = QVBoxLayout()
+        grid.addWidget(self.lbl_bytes_total)
+        grid.addWidget(self.lbl_bytes_sent)
+        grid.addWidget(self.progress)
+        grid.addWidget(self.btn_cancel, alignment=Qt.AlignCenter)
+
+        self.setLayout(grid)
+
+        self.sysex_transmit_thread = SysexTransmitThread(midi=self.midi, sysex_buffer=sysex_buffer,
+                                                         adaptive_rate=adaptive_rate, adaptive_echo=adaptive_echo)
+        self.sysex_transmit_thread.transmit_bytes.connect(self.on_update_progress)
+        self.sysex_transmit_thread.transmit_completed.connect(self.on_transmit_completed)
+        self.sysex_transmit_thread.start()
+
+    def on_btn_cancel(self):
+        self.sysex_transmit_thread.cancel()
+
+    def on_transmit_completed(self, success):
+        if success:
+            self.accept()
+        else:
+            self.reject()
+
+    def on_update_progress(self, bytes_sent):
+        self.lbl_bytes_sent.setText('Sent: {}'.format(bytes_to_str(bytes_sent)))
+        self.progress.setValue((bytes_sent / self.sysex_buffer.size) * 100)
+
+
+class SysexMultiTransmitWindow(QDialog):
+    def __init__(self, midis, sysex_buffer, parent=None):
+        super().__init__(parent)
+        self.parent = parent
+
+        self.midis = midis
+        self.sysex_buffer = sysex_buffer
+
+        self.setFixedWidth(300)
+        self.setWindowTitle('SYSEX Transmit {} ports'.format(len(midis)))
+
+        # Aggregate progress of all ports
+        self.total_size = sysex_buffer.size * len(midis)
+        self.lbl_bytes_total = QLabel('Total: {}'.format(bytes_to_str(self.total_size)))
+        self.lbl_bytes_sent = QLabel('Sent: ')
+        self.lbl_ports = QLabel('\n'.join(midi.get_port_out_name() for midi in midis))
+
+        self.progress = QProgressBar()
+        self.progress.setMinimum(0)
+        self.progress.setMaximum(100)
+
+        self.btn_cancel = QPushButton('Cancel')
+        self.btn_cancel.setFixedWidth(75)
+        self.btn_cancel.clicked.connect(self.on_btn_cancel)
+
+        grid = QVBoxLayout()
+        grid.addWidget(self.lbl_ports)
+        grid.addWidget(self.lbl_bytes_total)
+        grid.addWidget(self.lbl_bytes_sent)
+        grid.addWidget(self.progress)
+        grid.addWidget(self.btn_cancel, alignment=Qt.AlignCenter)
+
+        self.setLayout(grid)
+
+        # One transmit thread with its own MIDI object and transmit timeline per port
+        self.bytes_sent = [0] * len(midis)
+        self.num_completed = 0
+        self.transmit_canceled = False
+        self.sysex_transmit_threads = []
+        for i, midi in enumerate(midis):
+            thread = SysexTransmitThread(midi=midi, sysex_buffer=sysex_buffer)
+            thread.transmit_bytes.connect(lambda bytes_sent, index=i: self.on_update_progress(index, bytes_sent))
+            thread.transmit_completed.connect(self.on_transmit_completed)
+            self.sysex_transmit_threads.append(thread)
+        for thread in self.sysex_transmit_threads:
+            thread.start()
+
+    def on_btn_cancel(self):
+        self.transmit_canceled = True
+        for thread in self.sysex_transmit_threads:
+            thread.cancel()
+
+    def on_transmit_completed(self, success):
+        if not success:
+            self.on_btn_cancel()
+
+        # Close when the slowest port completed
+        self.num_completed += 1
+        if self.num_completed == len(self.sysex_transmit_threads):
+            for thread in self.sysex_transmit_threads:
+                thread.wait()
+            if self.transmit_canceled:
+                self.reject()
+            else:
+                self.accept()
+
+    def on_update_progress(self, index, bytes_sent):
+        self.bytes_sent[index] = bytes_sent
+        total_sent = sum(self.bytes_sent)
+        self.lbl_bytes_sent.setText('Sent: {}'.format(bytes_to_str(total_sent)))
+        self.progress.setValue((total_sent / self.total_size) * 100)
+
+
+class PortSelectDialog(QDialog):
+    def __init__(self, title, port_names, parent=None):
+        super().__init__(parent)
+
+        self.setWindowTitle(title)
+
+        # Checkable list of MIDI ports, item index is port ID
+        self.lst_ports = QListWidget()
+        for port_name in port_names:
+            item = QListWidgetItem(port_name)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Unchecked)
+            self.lst_ports.addItem(item)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.lst_ports)
+        layout.addWidget(buttons)
+
+        self.setLayout(layout)
+
+    def get_port_ids(self):
+        return [i for i in range(self.lst_ports.count()) if self.lst_ports.item(i).checkState() == Qt.Checked]
+
+
+class SysexReceiveThread(QThread):
+    receive_bytes = Signal(int)
+    receive_completed = Signal(bool)
+
+    def __init__(self, midi, sysex_writer=None, complete_timeout=None, dump_detector=None):
+        QThread.__init__(self)
+
+        # Optionally stream completed messages to file, complete when the device profile of the received data reports
+        # a complete dump or when not receiving data anymore
+        self.sysex_writer = sysex_writer
+        self.complete_timeout = complete_timeout
+        self.dump_detector = dump_detector
+        self.session = sysex_session.SysexSession(midi)
+        self.sysex_reassembler = self.session.sysex_reassembler
+
+    def cancel(self):
+        self.session.cancel_token.cancel()
+
+    def run(self):
+        for result in self.session.iter_receive(sysex_writer=self.sysex_writer, complete_timeout=self.complete_timeout,
+                                                dump_detector=self.dump_detector):
+            self.receive_bytes.emit(result.num_bytes)
+
+        # Done clicked or receive completed, failed when writing the file failed
+        self.receive_completed.emit(self.session.result.error is None)
+
+
+class SysexReceiveWindow(QDialog):
+    def __init__(self, midi, parent=None):
+        super().__init__(parent)
+        self.midi = midi
+        self.parent = parent
+        self.sysex_buffer = bytes()
+
+        self.setFixedWidth(210)
+        self.setFixedHeight(130)
+        self.setWindowTitle('SYSEX Receive')
+
+        self.bytes_received = QLabel('Bytes received: 0 Bytes')
+
+        self.button_done = QPushButton('Done')
+        self.button_done.setFixedWidth(75)
+        self.button_done.clicked.connect(self.on_btn_done)
+
+        grid = QVBoxLayout()
+        grid.addWidget(self.bytes_received)
+        grid.addWidget(self.button_done, alignment=Qt.AlignCenter)
+
+        self.setLayout(grid)
+
+        # Completes automatically when a known device dump is complete, otherwise when Done clicked
+        self.sysex_receive_thread = SysexReceiveThread(self.midi, dump_detector=sysex_devices.DumpDetector())
+        self.sysex_receive_thread.receive_bytes.connect(self.on_update_progress)
+        self.sysex_receive_thread.receive_completed.connect(self.on_completed)
+        self.sysex_receive_thread.start()
+
+    def closeEvent(self, event):
+        self.sysex_receive_thread.cancel()
+        event.ignore()
+
+    def on_btn_done(self):
+        self.sysex_receive_thread.cancel()
+
+    def on_update_progress(self, bytes_received):
+        self.bytes_received.setText('Bytes received: {}'.format(bytes_to_str(bytes_received)))
+
+    def on_completed(self):
+        self.sysex_buffer = self.sysex_receive_thread.sysex_reassembler.get_data()
+        self.accept()
+
+
+class SysexMultiReceiveWindow(QDialog):
+    def __init__(self, midis, sysex_writers, parent=None):
+        super().__init__(parent)
+        self.midis = midis
+        self.sysex_files = [sysex_writer.path for sysex_writer in sysex_writers]
+        self.parent = parent
+
+        # Saved files and errors per port when completed
+        self.saved_files = []
+        self.errors = []
+
+        self.setFixedWidth(360)
+        self.setWindowTitle('SYSEX Receive {} ports'.format(len(midis)))
+
+        self.lbl_ports = []
+        grid = QVBoxLayout()
+        for midi in midis:
+            label = QLabel('{}: 0 Bytes'.format(midi.get_port_in_name()))
+            self.lbl_ports.append(label)
+            grid.addWidget(label)
+
+        self.button_done = QPushButton('Done')
+        self.button_done.setFixedWidth(75)
+        self.button_done.clicked.connect(self.on_btn_done)
+        grid.addWidget(self.button_done, alignment=Qt.AlignCenter)
+
+        self.setLayout(grid)
+
+        # One receive thread streaming to its own file per port, completed per port when dump complete or idle
+        self.num_completed = 0
+        self.sysex_receive_threads = []
+        for i, (midi, sysex_writer) in enumerate(zip(midis, sysex_writers)):
+            thread = SysexReceiveThread(midi, sysex_writer=sysex_writer,
+                                        complete_timeout=MIDI_RX_COMPLETE_SEC,
+                                        dump_detector=sysex_devices.DumpDetector())
+            thread.receive_bytes.connect(lambda bytes_received, index=i: self.on_update_progress(index,
+                                                                                              bytes_received))
+            thread.receive_completed.connect(lambda success, index=i: self.on_completed(index, success))
+            self.sysex_receive_threads.append(thread)
+        for thread in self.sysex_receive_threads:
+            thread.start()
+
+    def closeEvent(self, event):
+        self.on_btn_done()
+        event.ignore()
+
+    def on_btn_done(self):
+        for thread in self.sysex_receive_threads:
+            thread.cancel()
+
+    def on_update_progress(self, index, bytes_received):
+        self.lbl_ports[index].setText('{}: {}'.format(self.midis[index].get_port_in_name(),
+                                                      bytes_to_str(bytes_received)))
+
+    def on_completed(self, index, success):
+        # Save file of this port, ports without SYSEX data do not create a file
+        thread = self.sysex_receive_threads[index]
+        thread.wait()
+        if not success:
+            thread.sysex_writer.abort()
+            self.errors.append(self.sysex_files[index])
+        elif not thread.sysex_reassembler.size:
+            thread.sysex_writer.abort()
+        else:
+            try:
+                thread.sysex_writer.close()
+                self.saved_files.append(self.sysex_files[index])
+            except OSError:
+                self.errors.append(self.sysex_files[index])
+        self.lbl_ports[index].setText(self.lbl_ports[index].text() + ' (done)')
+
+        self.num_completed += 1
+        if self.num_completed == len(self.sysex_receive_threads):
+            self.accept()
+
+
+class TransmitSettingsDialog(QDialog):
+    def __init__(self, tx_scheduler, adaptive=False, adaptive_echo=False, parent=None):
+        super().__init__(parent)
+
+        self.setWindowTitle('Transmit settings')
+
+        self.spin_baudrate = QSpinBox()
+        self.spin_baudrate.setRange(1000, 10000000)
+        self.spin_baudrate.setSingleStep(1000)
+        self.spin_baudrate.setSuffix(' baud')
+        self.spin_baudrate.setValue(int(tx_scheduler.baudrate))
+
+        self.spin_gap = QDoubleSpinBox()
+        self.spin_gap.setRange(0, 10000)
+        self.spin_gap.setSuffix(' ms')
+        self.spin_gap.setValue(tx_scheduler.gap * 1000)
+
+        self.spin_min_delay = QDoubleSpinBox()
+        self.spin_min_delay.setRange(0, 10000)
+        self.spin_min_delay.setSuffix(' ms')
+        self.spin_min_delay.setValue(tx_scheduler.min_delay * 1000)
+
+        self.chk_adaptive = QCheckBox('Adaptive rate (requires MIDI IN)')
+        self.chk_adaptive.setToolTip('Lower link rate on NAK replies, faster rates are learned per port only '
+                                     'when echoed messages are verified')
+        self.chk_adaptive.setChecked(adaptive)
+
+        self.chk_adaptive_echo = QCheckBox('Verify echo (loopback / MIDI thru)')
+        self.chk_adaptive_echo.setChecked(adaptive_echo)
+        self.chk_adaptive_echo.setEnabled(adaptive)
+        self.chk_adaptive.toggled.connect(self.chk_adaptive_echo.setEnabled)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+
+        layout = QFormLayout()
+        layout.addRow('Link rate:', self.spin_baudrate)
+        layout.addRow('Gap between messages:', self.spin_gap)
+        layout.addRow('Minimum message delay:', self.spin_min_delay)
+        layout.addRow(self.chk_adaptive)
+        layout.addRow(self.chk_adaptive_echo)
+        layout.addRow(buttons)
+
+        self.setLayout(layout)
+
+    def get_tx_scheduler(self):
+        return midi_util.TransmitScheduler(baudrate=self.spin_baudrate.value(),
+                                           gap=self.spin_gap.value() / 1000,
+                                           min_delay=self.spin_min_delay.value() / 1000)
+
+    def get_adaptive(self):
+        return self.chk_adaptive.isChecked()
+
+    def get_adaptive_echo(self):
+        return self.chk_adaptive_echo.isChecked()
+
+
+class StatisticsMessageBox(QMessageBox):
+    def __init__(self, parent=None):
+        QMessageBox.__init__(self)
+
+        # Store parent
+        self.parent = parent
+
+        # Enable size grip on lower right corner
+        self.setSizeGripEnabled(True)
+
+    def event(self, e):
+        # Undocumented: The only way of resizing a QMessageBox is from an event
+        result = QMessageBox.event(self, e)
+
+        # Set min/max sizes QMessageBox
+        self.setMinimumSize(275, 125)
+        self.setMaximumSize(500, 500)
+
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+
+        # Show dialog on center of parent window
+        if self.parent:
+            geo = self.geometry()
+            geo.moveCenter(self.parent.geometry().center())
+            self.setGeometry(geo)
+
+        # Return event
+        return result
+
+
+class AboutDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self.setMinimumSize(500, 400)
+        self.setWindowTitle('About')
+
+        python_version = 'v{}.{}.{}'.format(sys.version_info[0], sys.version_info[1], sys.version_info[2])
+
+        txt_info = QTextEdit()
+
+        font = txt_info.font()
+        font.setFamily('')
+        font.setFixedPitch(True)
+        font.setKerning(0)
+        font.setWeight(QFont.Normal)
+        font.setPixelSize(14)
+        font.setItalic(False)
+
+        txt_info.setFont(font)
+        txt_info.setReadOnly(True)
+
+        txt_info.append('---')
+        txt_info.append('App name:  {}'.format(APP_NAME))
+        txt_info.append('Version:   {}'.format(get_app_version()))
+        txt_info.append('Developer: {}'.format(APP_DEVELOPER))
+        txt_info.append('Copyright: {}'.format(APP_YEAR))
+        txt_info.append('License:   {}'.format(APP_LICENSE))
+        txt_info.append('Source:    {}'.format(APP_WEBSITE))
+        txt_info.append('Python:    {}'.format(python_version))
+        txt_info.append('Pyside6:   {}'.format(PySide6.__version__))
+        txt_info.append('Backend:   {} v{}'.format(parent.midi.get_backend_name(), parent.midi.get_backend_version()))
+        txt_info.append('---')
+        if sys.platform == 'linux':
+            txt_info.append('System:   {}'.format(platform.system()))
+            txt_info.append('Machine:  {}'.format(platform.machine()))
+            txt_info.append('Version:  {}'.format(platform.version()))
+            txt_info.append('Distro:   {}'.format(distro.name(pretty=True)))
+            txt_info.append('Name:     {}'.format(distro.codename().capitalize()))
+            txt_info.append('Desktop   {}'.format(os.environ.get('XDG_SESSION_TYPE').capitalize()))
+        elif sys.platform == 'win32':
+            txt_info.append('OS:       {}'.format('Windows'))
+        txt_info.append('---')
+
+        btn_ok = QPushButton('Ok')
+        btn_ok.clicked.connect(self.accept)
+        btn_ok.resize(btn_ok.sizeHint())
+
+        # Add button to window
+        layout = QVBoxLayout(self)
+        layout.addWidget(txt_info)
+        layout.addWidget(btn_ok)
+
+        self.setLayout(layout)
+
+
+class MainWindow(QMainWindow):
+    def __init__(self, sysex_file=None, sysex_transmit=False, backend=None, verbose=False):
+        super().__init__()
+
+        # Create exit action with icon, shortcut, status tip and close window click event
+        path = Path(__file__).resolve().parent
+
+        # Load application settings
+        self.settings = QSettings(APP_DEVELOPER, APP_NAME)
+
+        # Variables
+        self.verbose = verbose
+        self.initialized = False
+        self.sysex_data = None
+        self.sysex_statistics = None
+        self.file_saved = False
+        self.callback_sysex_file = sysex_file
+        self.callback_sysex_transmit = sysex_transmit
+
+        # Test-only backends are hidden unless enabled in the settings
+        self.dev_backends = self.settings.value('midi/dev-backends', 'false') == 'true'
+
+        # Load MIDI backend from commandline or settings, falls back to first available backend
+        backend_setting = self.settings.value('midi/backend', '')
+        if backend_setting in midi_backend.DEV_BACKENDS and not self.dev_backends:
+            backend_setting = ''
+        try:
+            midi_backend.load_backend(backend or backend_setting or None)
+        except (ImportError, ValueError) as err:
+            messagebox.MessageBoxError(self, message='Error: {}'.format(err))
+            sys.exit(1)
+
+        # Create MIDI object
+        self.midi = midi_backend.MIDI(verbose=self.verbose)
+        if self.verbose:
+            print('Using {} MIDI v{}'.format(self.midi.get_backend_name(), self.midi.get_backend_version()))
+        try:
+            tx_scheduler = midi_util.TransmitScheduler(
+                baudrate=self.settings.value('transmit/baudrate', midi_util.MIDI_BAUDRATE, type=int),
+                gap=self.settings.value('transmit/gap-ms', 0.0, type=float) / 1000,
+                min_delay=self.settings.value('transmit/min-delay-ms', 0.0, type=float) / 1000)
+        except ValueError:
+            # Invalid stored settings
+            tx_scheduler = midi_util.TransmitScheduler()
+        self.midi.set_tx_scheduler(tx_scheduler)
+        self.tx_adaptive = self.settings.value('transmit/adaptive', 'false') == 'true'
+        self.tx_adaptive_echo = self.settings.value('transmit/adaptive-echo', 'false') == 'true'
+
+        # Selected MIDI ports stay open between transfers
+        self.midi_port_pool = midi_util.MidiPortPool(self.midi, verbose=self.verbose)
+
+        # Get / set window size
+        self.resize(self.settings.value('mainwindow/size', QSize(600, 500)))
+        # Get / set window position
+        self.move(self.settings.value('mainwindow/position', QPoint(500, 500)))
+        # Set minimum window size
+        self.setMinimumSize(500, 200)
+        # Set window title
+        self.setWindowTitle('{} v{} by {}'.format(APP_NAME, get_app_version(), APP_DEVELOPER))
+        # Set window icon
+        self.setWindowIcon(QIcon(os.path.join(path_images, 'midi.png')))
+
+        self.lbl_midi_in = QLabel('MIDI IN:')
+        self.lbl_midi_out = QLabel('MIDI OUT:')
+        self.cmb_midi_port_in = QComboBox(self)
+        self.cmb_midi_port_out = QComboBox(self)
+        self.cmb_midi_port_in.addItem('Disconnect')
+        self.cmb_midi_port_out.addItem('Disconnect')
+        self.cmb_midi_port_in.currentTextChanged.connect(self.midi_port_selected)
+        self.cmb_midi_port_out.currentTextChanged.connect(self.midi_port_selected)
+
+        grid = QGridLayout()
+        grid.setColumnStretch(1, 1)
+        grid.addWidget(self.lbl_midi_in, 0, 0)
+        grid.addWidget(self.cmb_midi_port_in, 0, 1)
+        grid.addWidget(self.lbl_midi_out, 1, 0)
+        grid.addWidget(self.cmb_midi_port_out, 1, 1)
+        grid.setVerticalSpacing(10)
+
+        port_box1 = QGroupBox()
+        port_box1.setLayout(grid)
+        port_box1.setFixedHeight(100)
+
+        # self.lbl_info = QLabel('Info:')
+        # self.lbl_info.setFixedHeight(15)
+        # self.txt_info = QTextEdit()
+        # self.txt_info.setReadOnly(True)
+        # self.txt_info.setFixedHeight(100)
+
+        # Create hex view and center on window
+        self.hex_view = hexview.SysexHexView()
+        self.hex_view.setHidden(False if self.settings.value('view/log', 'true') == 'true' else True)
+
+        vbox = QVBoxLayout()
+        vbox.addWidget(port_box1)
+        # vbox.addWidget(self.lbl_info)
+        # vbox.addWidget(self.txt_info)
+        vbox.addWidget(self.hex_view)
+
+        widget = QWidget(self)
+        widget.setLayout(vbox)
+        self.setCentralWidget(widget)
+
+        # Create menubar
+        menubar = self.menuBar()
+
+        # Add File menu
+        self.file_new_action = QAction(QIcon(os.path.join(path_images, 'new.png')), '&New', self)
+        self.file_new_action.setShortcut('Ctrl+N')
+        self.file_new_action.triggered.connect(self.file_new)
+
+        self.file_open_action = QAction(QIcon(os.path.join(path_images, 'open.png')), '&Open', self)
+        self.file_open_action.setShortcut('Ctrl+O')
+        self.file_open_action.setStatusTip('Open SYSEX file')
+        self.file_open_action.triggered.connect(self.file_open)
+
+        self.file_save_action = QAction(QIcon(os.path.join(path_images, 'save.png')), '&Save', self)
+        self.file_save_action.setShortcut('Ctrl+S')
+        self.file_save_action.setStatusTip('Save SYSEX to file')
+        self.file_save_action.setEnabled(False)
+        self.file_save_action.triggered.connect(self.file_save)
+
+        self.file_exit_action = QAction(QIcon(os.path.join(path_images, 'exit.png')), '&Exit', self)
+        self.file_exit_action.setShortcut('Ctrl+Q')
+        self.file_exit_action.setStatusTip('Exit application')
+        self.file_exit_action.triggered.connect(self.close)
+
+        menu_file = menubar.addMenu('&File')
+        menu_file.addAction(self.file_new_action)
+        menu_file.addAction(self.file_open_action)
+        menu_file.addAction(self.file_save_action)
+        menu_file.addSeparator()
+        menu_file.addAction(self.file_exit_action)
+
+        # Add Edit menu
+        self.copy_action = QAction('&Copy', self)
+        self.copy_action.setShortcut('Ctrl+C')
+        self.copy_action.setEnabled(False)
+        self.copy_action.triggered.connect(self.edit_copy)
+        # self.paste_action = QAction('&Paste', self)
+        # self.paste_action.setShortcut('Ctrl+V')
+        self.select_all_action = QAction('&Select all', self)
+        self.select_all_action.setShortcut('Ctrl+A')
+        self.select_all_action.setEnabled(False)
+        self.select_all_action.triggered.connect(self.edit_select_all)
+
+        menu_edit = menubar.addMenu('&Edit')
+        menu_edit.addAction(self.copy_action)
+        # menu_edit.addAction(paste_action)
+        menu_edit.addSeparator()
+        menu_edit.addAction(self.select_all_action)
+
+        # Add MIDI menu
+        self.transmit_sysex_action = QAction(QIcon(os.path.join(path_images, 'sysex_transmit.png')),
+                                             '&Transmit SYSEX', self)
+        self.transmit_sysex_action.setShortcut('Ctrl+T')
+        self.transmit_sysex_action.setStatusTip('Transmit SYSEX to device')
+        self.transmit_sysex_action.setEnabled(False)
+        self.transmit_sysex_action.triggered.connect(self.midi_transmit_sysex)
+
+        self.transmit_multi_action = QAction('Transmit SYSEX to &multiple ports...', self)
+        self.transmit_multi_action.setShortcut('Ctrl+Shift+T')
+        self.transmit_multi_action.setStatusTip('Transmit SYSEX to multiple devices in parallel')
+        self.transmit_multi_action.setEnabled(False)
+        self.transmit_multi_action.triggered.connect(self.midi_transmit_sysex_multi)
+
+        self.receive_sysex_action = QAction(QIcon(os.path.join(path_images, 'sysex_receive.png')),
+                                            '&Receive SYSEX', self)
+        self.receive_sysex_action.setShortcut('Ctrl+R')
+        self.receive_sysex_action.setStatusTip('Receive SYSEX from device')
+        self.receive_sysex_action.triggered.connect(self.midi_receive_sysex)
+
+        self.receive_multi_action = QAction('Receive SYSEX from multiple &ports...', self)
+        self.receive_multi_action.setShortcut('Ctrl+Shift+R')
+        self.receive_multi_action.setStatusTip('Receive SYSEX from multiple devices at once, one file per port')
+        self.receive_multi_action.triggered.connect(self.midi_receive_sysex_multi)
+        self.transmit_settings_action = QAction('Transmit &settings', self)
+        self.transmit_settings_action.setStatusTip('Configure SYSEX transmit link rate and message delays')
+        self.transmit_settings_action.triggered.connect(self.midi_transmit_settings)
+        self.midi_refresh_action = QAction(QIcon(os.path.join(path_images, 'midi.png')), '&Refresh ports', self)
+        self.midi_refresh_action.setShortcut('F5')
+        self.midi_refresh_action.setStatusTip('Refresh MIDI ports')
+        self.midi_refresh_action.triggered.connect(self.midi_refresh_ports)
+
+        menu_midi = menubar.addMenu('&MIDI')
+        menu_midi.addAction(self.receive_sysex_action)
+        menu_midi.addAction(self.receive_multi_action)
+        menu_midi.addAction(self.transmit_sysex_action)
+        menu_midi.addAction(self.transmit_multi_action)
+        menu_midi.addAction(self.transmit_settings_action)
+        menu_midi.addSeparator()
+        menu_midi.addAction(self.midi_refresh_action)
+
+        # Add MIDI backend selection
+        menu_backend = menu_midi.addMenu('&Backend')
+        self.backend_action_group = QActionGroup(self)
+        self.backend_action_group.setExclusive(True)
+        for backend_name in midi_backend.get_backend_names():
+            if backend_name in midi_backend.DEV_BACKENDS and not self.dev_backends and \
+                    backend_name != midi_backend.get_backend_name():
+                continue
+            action = QAction(backend_name, self)
+            action.setCheckable(True)
+            action.setChecked(backend_name == midi_backend.get_backend_name())
+            action.triggered.connect(lambda _, name=backend_name: self.midi_select_backend(name))
+            self.backend_action_group.addAction(action)
+            menu_backend.addAction(action)
+
+        # Add View menu
+        self.view_log_action = QAction('&Show log', self)
+        self.view_log_action.setCheckable(True)
+        self.view_log_action.setChecked(True if self.settings.value('view/log', 'true') == 'true' else False)
+        self.view_log_action.triggered.connect(self.view_log_change)
+
+        self.view_statistics_action = QAction('&Statistics', self)
+        self.view_statistics_action.setShortcut('Ctrl+I')
+        self.view_statistics_action.setStatusTip('View statistics')
+        self.view_statistics_action.triggered.connect(self.view_statistics)
+
+        menu_view = menubar.addMenu('&View')
+        menu_view.addAction(self.view_log_action)
+        menu_view.addAction(self.view_statistics_action)
+
+        # Add Help menu
+        self.help_action = QAction(QIcon(os.path.join(path_images, 'web.png')), '&Help', self)
+        self.help_action.setShortcut('F1')
+        self.help_action.setStatusTip('Open developers website on Github')
+        self.help_action.triggered.connect(self.help_website)
+
+        self.about_action = QAction(QIcon(os.path.join(path_images, 'about.png')), '&About', self)
+        self.about_action.setShortcut('Ctrl+?')
+        self.about_action.setStatusTip('About application')
+        self.about_action.triggered.connect(self.help_about)
+
+        menu_help = menubar.addMenu('&Help')
+        menu_help.addAction(self.help_action)
+        menu_help.addSeparator()
+        menu_help.addAction(self.about_action)
+
+        # Create toolbar
+        toolbar = self.addToolBar('Toolbar')
+        toolbar.addAction(self.file_new_action)
+        toolbar.addAction(self.file_open_action)
+        toolbar.addAction(self.file_save_action)
+        toolbar.addSeparator()
+        toolbar.addAction(self.receive_sysex_action)
+        toolbar.addAction(self.transmit_sysex_action)
+        toolbar.addSeparator()
+        toolbar.addAction(self.file_exit_action)
+
+        # Create statusbar
+        self.statusBar()
+
+        # MIDI ports are selected when the port watcher reports the ports
+        self.midi_port_selection = (self.settings.value('midi/port-in', ''),
+                                    self.settings.value('midi/port-out', ''))
+        self.midi_port_watcher = None
+        self.midi_watch_ports()
+
+    def __del__(self):
+        pass
+
+    def enterEvent(self, _):
+        if not self.initialized:
+            self.initialized = True
+
+            # Open SYSEX file
+            if self.callback_sysex_file:
+                self.file_open(load_sysex_file=self.callback_sysex_file,
+                               sysex_transmit=self.callback_sysex_transmit)
+
+    def settings_save(self):
+        # Window settings
+        self.settings.beginGroup("mainwindow")
+        self.settings.setValue("size", self.size())
+        self.settings.setValue("position", self.pos())
+        self.settings.endGroup()
+
+        # MIDI settings
+        self.settings.beginGroup("midi")
+        port_in, port_out = self.midi_port_selection or (self.cmb_midi_port_in.currentText(),
+                                                         self.cmb_midi_port_out.currentText())
+        self.settings.setValue("port-in", port_in)
+        self.settings.setValue("port-out", port_out)
+        self.settings.setValue("backend", midi_backend.get_backend_name())
+        self.settings.endGroup()
+
+        # Transmit settings
+        tx_scheduler = self.midi.get_tx_scheduler()
+        self.settings.beginGroup("transmit")
+        self.settings.setValue("baudrate", tx_scheduler.baudrate)
+        self.settings.setValue("gap-ms", tx_scheduler.gap * 1000)
+        self.settings.setValue("min-delay-ms", tx_scheduler.min_delay * 1000)
+        self.settings.setValue("adaptive", self.tx_adaptive)
+        self.settings.setValue("adaptive-echo", self.tx_adaptive_echo)
+        self.settings.endGroup()
+
+        # View
+        self.settings.setValue('view/log', self.view_log_action.isChecked())
+
+    def closeEvent(self, _):
+        self.settings_save()
+        self.midi_port_watcher.stop()
+        self.midi_port_pool.close()
+
+    def file_new(self):
+        if self.sysex_data and not self.file_saved:
+            msgbox = messagebox.MessageBoxQuestion(self,
+                                                   message='Do you want to save changes?',
+                                                   buttons=QMessageBox.StandardButton.Yes |
+                                                           QMessageBox.StandardButton.No |
+                                                           QMessageBox.StandardButton.Cancel)
+            if msgbox.answer == QMessageBox.StandardButton.Yes:
+                if not self.file_save():
+                    self.statusBar().showMessage('File save aborted')
+                    return
+            elif msgbox.answer == QMessageBox.StandardButton.Cancel:
+                return
+
+        self.sysex_data_close()
+        self.file_save_action.setEnabled(False)
+        self.copy_action.setEnabled(False)
+        self.select_all_action.setEnabled(False)
+        self.transmit_sysex_action.setEnabled(False)
+        self.transmit_multi_action.setEnabled(False)
+        self.file_saved = False
+
+    def file_open(self, load_sysex_file=None, sysex_transmit=False):
+        if load_sysex_file:
+            path = load_sysex_file
+        else:
+            path = self.settings.value('history/path', str(Path.home()))
+            if not os.path.exists(path):
+                path = str(Path.home())
+            path, _ = QFileDialog.getOpenFileName(self, 'Open file', path, 'SYSEX Files (*.syx)')
+
+        # Make absolute path
+        path = os.path.abspath(path)
+
+        # Check path
+        if not path:
+            self.statusBar().showMessage('No file selected'.format())
+        elif not os.path.exists(path):
+            self.statusBar().showMessage('File {} not found'.format(path))
+        else:
+            self.settings.setValue('history/path', os.path.dirname(path))
+            try:
+                # Map and index file
+                sysex_buffer = midi_util.open_sysex_file(path)
+            except OSError as err:
+                self.statusBar().showMessage(str(err))
+                return
+
+            if not sysex_buffer.size > 2:
+                sysex_buffer.close()
+                messagebox.MessageBoxError(self, message='Error: Invalid SYSEX file')
+                return
+            if not sysex_buffer.is_valid():
+                sysex_buffer.close()
+                messagebox.MessageBoxError(self, message='Error: Invalid SYSEX data')
+                return
+
+            self.sysex_data_close()
+            self.sysex_data = sysex_buffer
+
+            # Activate buttons
+            self.file_save_action.setEnabled(True)
+            self.copy_action.setEnabled(True)
+            self.select_all_action.setEnabled(True)
+            self.transmit_sysex_action.setEnabled(True)
+            self.transmit_multi_action.setEnabled(True)
+            self.statusBar().showMessage('File "{}" opened'.format(os.path.basename(path)))
+            self.file_saved = True
+
+            # Add SYSEX data to textbox
+            self.midi_print_sysex()
+
+            # Ask for confirmation
+            if not load_sysex_file or not sysex_transmit:
+                msgbox = messagebox.MessageBoxQuestion(self, message='Transmit SYSEX?')
+                if msgbox.answer == QMessageBox.StandardButton.Yes:
+                    sysex_transmit = True
+                else:
+                    self.statusBar().showMessage('SYSEX transmit aborted')
+
+            if sysex_transmit:
+                # Transmit SYSEX
+                self.midi_transmit_sysex()
+                self.statusBar().showMessage('SYSEX transmit completed')
+
+    def file_save(self):
+        path = self.settings.value('history/path', str(Path.home()))
+        if not os.path.exists(path):
+            path = str(Path.home())
+        path, _ = QFileDialog.getSaveFileName(self, 'Save file', path, 'SYSEX Files (*.syx)')
+
+        if not path:
+            self.statusBar().showMessage('No file selected'.format())
+            return False
+        elif not os.access(os.path.dirname(path), os.W_OK):
+            self.statusBar().showMessage('Directory {} not writable'.format(path))
+            return False
+        else:
+            self.settings.setValue('history/path', os.path.dirname(path))
+
+            if not path.endswith('.syx'):
+                path += '.syx'
+
+            sysex_writer = None
+            try:
+                # Write to temporary file and rename
+                sysex_writer = midi_util.SysexFileWriter(path)
+                sysex_writer.write(self.sysex_data.data)
+                if self.sysex_data.path and os.path.exists(path) and os.path.samefile(path, self.sysex_data.path):
+                    # A memory mapped file cannot be replaced on Windows, release it and continue with a copy in memory
+                    self.sysex_data_copy()
+                sysex_writer.close()
+            except OSError as err:
+                if sysex_writer:
+                    sysex_writer.abort()
+                self.statusBar().showMessage(str(err))
+                return False
+
+            self.file_saved = True
+            self.statusBar().showMessage('File "{}" saved'.format(os.path.basename(path)))
+
+        return True
+
+    def sysex_data_close(self):
+        # Release memory mapped SYSEX file
+        self.hex_view.clear()
+        if self.sysex_data is not None:
+            self.sysex_data.close()
+        self.sysex_data = None
+        self.sysex_statistics = None
+
+    def sysex_data_copy(self):
+        # Replace memory mapped SYSEX file by a copy in memory, statistics remain valid
+        path = self.sysex_data.path
+        sysex_buffer = midi_util.SysexBuffer(bytes(self.sysex_data.data))
+        self.hex_view.clear()
+        released = self.sysex_data.close()
+        self.sysex_data = sysex_buffer
+        self.midi_print_sysex()
+        if not released:
+            raise OSError('File "{}" is still in use'.format(os.path.basename(path)))
+
+    def edit_copy(self):
+        self.hex_view.copy()
+
+    def edit_select_all(self):
+        self.hex_view.select_all()
+
+    def midi_watch_ports(self):
+        # (Re)start port watcher of selected backend
+        if self.midi_port_watcher:
+            self.midi_port_watcher.stop()
+        self.midi_port_watcher = MidiPortWatcher()
+        self.midi_port_watcher.ports_changed.connect(self.on_midi_ports_changed)
+        self.midi_port_watcher.start()
+
+    def midi_refresh_ports(self):
+        # Backends without hot-plug detection rescan only when no ports are open, pooled ports reopen on next transfer
+        if not self.midi.get_backend_capabilities().get('hotplug', True):
+            self.midi_port_pool.close()
+        self.midi_port_watcher.refresh()
+
+    @staticmethod
+    def midi_update_port_combo(cmb, ports):
+        # Insert and remove changed ports only, first item is 'Disconnect'
+        selected_port_name = cmb.currentText()
+
+        for i, port_name in enumerate(ports, 1):
+            if i < cmb.count() and cmb.itemText(i) == port_name:
+                continue
+
+            # Remove ports until this port or insert new port
+            for j in range(i + 1, cmb.count()):
+                if cmb.itemText(j) == port_name:
+                    for _ in range(j - i):
+                        cmb.removeItem(i)
+                    break
+            else:
+                cmb.insertItem(i, port_name)
+
+        while cmb.count() > len(ports) + 1:
+            cmb.removeItem(cmb.count() - 1)
+
+        # Keep selection, Disconnect when selected port was removed
+        index = cmb.findText(selected_port_name, Qt.MatchExactly)
+        cmb.setCurrentIndex(max(0, index))
+
+    def on_midi_ports_changed(self, ports_in, ports_out):
+        self.midi_update_port_combo(self.cmb_midi_port_in, ports_in)
+        self.midi_update_port_combo(self.cmb_midi_port_out, ports_out)
+
+        # Select MIDI ports from settings or previous backend
+        if self.midi_port_selection:
+            for cmb, port_name in zip((self.cmb_midi_port_in, self.cmb_midi_port_out), self.midi_port_selection):
+                index = cmb.findText(port_name, Qt.MatchEndsWith) if port_name else -1
+                cmb.setCurrentIndex(max(0, index))
+            self.midi_port_selection = None
+
+    def midi_port_selected(self):
+        # Close pooled ports when another port is selected
+        self.midi_port_pool.select(self.cmb_midi_port_in.currentText(), self.cmb_midi_port_out.currentText())
+
+    def midi_port_out_open(self):
+        return self.midi_port_pool.port_out_open(port_id=self.cmb_midi_port_out.currentIndex()-1,
+                                                 port_name=self.cmb_midi_port_out.currentText())
+
+    def midi_port_in_open(self):
+        return self.midi_port_pool.port_in_open(port_id=self.cmb_midi_port_in.currentIndex()-1,
+                                                port_name=self.cmb_midi_port_in.currentText())
+
+    def midi_port_status(self):
+        # Port open and reuse counts of this session
+        statistics = self.midi_port_pool.get_statistics()
+        return 'MIDI IN opened {}x reused {}x, MIDI OUT opened {}x reused {}x'.format(
+            statistics['in_opens'], statistics['in_reuses'], statistics['out_opens'], statistics['out_reuses'])
+
+    def midi_select_backend(self, name):
+        # Close ports of current backend and create MIDI object of selected backend
+        tx_scheduler = self.midi.get_tx_scheduler()
+        self.midi_port_pool.close()
+        try:
+            midi_backend.load_backend(name, fallback=False)
+            self.statusBar().showMessage('MIDI backend {} selected'.format(name))
+        except ImportError as err:
+            messagebox.MessageBoxError(self, message='Error: {}'.format(err))
+        self.midi = midi_backend.MIDI(verbose=self.verbose)
+        self.midi.set_tx_scheduler(tx_scheduler)
+        self.midi_port_pool.set_midi(self.midi)
+
+        # Check active backend
+        for action in self.backend_action_group.actions():
+            action.setChecked(action.text() == midi_backend.get_backend_name())
+
+        # Keep selected port names when available in the new backend
+        self.midi_port_selection = (self.cmb_midi_port_in.currentText(), self.cmb_midi_port_out.currentText())
+        self.midi_watch_ports()
+
+    def midi_transmit_sysex(self):
+        # Open MIDI output port or reuse open port
+        if not self.midi_port_out_open():
+            messagebox.MessageBoxError(self, message='Cannot open MIDI output port.')
+            return
+
+        adaptive_rate = None
+        tx_scheduler = self.midi.get_tx_scheduler()
+        if self.tx_adaptive:
+            # Adaptive rate watches replies on MIDI input port
+            if not self.midi_port_in_open():
+                messagebox.MessageBoxError(self, message='Adaptive rate requires a MIDI input port.')
+                return
+
+            if self.tx_adaptive_echo:
+                # Start with learned rate of this port, echo verifies faster rates
+                adaptive_rate = midi_util.AdaptiveRate(baudrate=self.settings.value(
+                    self.adaptive_settings_key(), midi_util.MIDI_ADAPTIVE_BAUDRATE, type=int))
+            else:
+                # Without echo transfers are not verified, only lower the configured rate on NAK replies
+                adaptive_rate = midi_util.AdaptiveRate(baudrate=tx_scheduler.baudrate,
+                                                       max_baudrate=tx_scheduler.baudrate)
+
+            # Do not change configured link rate
+            self.midi.set_tx_scheduler(midi_util.TransmitScheduler(baudrate=adaptive_rate.baudrate,
+                                                                   gap=tx_scheduler.gap,
+                                                                   min_delay=tx_scheduler.min_delay))
+
+        # Show SYSEX transmit dialog box
+        dialog = SysexTransmitWindow(midi=self.midi, sysex_buffer=self.sysex_data, adaptive_rate=adaptive_rate,
+                                     adaptive_echo=self.tx_adaptive_echo, parent=self)
+
+        # Wait until True (Ok / accepted) or False (Cancel / rejected) clicked
+        if dialog.exec():
+            self.statusBar().showMessage('SYSEX transmit completed ({})'.format(self.midi_port_status()))
+        elif dialog.sysex_transmit_thread.session.result.error:
+            result = dialog.sysex_transmit_thread.session.result
+            # Reopen ports on next transmit
+            self.midi_port_pool.close()
+            messagebox.MessageBoxError(self, message='SYSEX {}.'.format(result.error.lower()))
+        else:
+            self.statusBar().showMessage('SYSEX transmit canceled')
+
+        if adaptive_rate:
+            # Store learned rate of this port, only verified by echo
+            if self.tx_adaptive_echo and adaptive_rate.get_learned_baudrate():
+                self.settings.setValue(self.adaptive_settings_key(), adaptive_rate.get_learned_baudrate())
+            self.midi.set_tx_scheduler(tx_scheduler)
+
+    def midi_transmit_sysex_multi(self):
+        # Select MIDI output ports, first combo box item is Disconnect
+        port_names = [self.cmb_midi_port_out.itemText(i) for i in range(1, self.cmb_midi_port_out.count())]
+        dialog = PortSelectDialog('Transmit to multiple ports', port_names, parent=self)
+        if not dialog.exec() or not dialog.get_port_ids():
+            return
+
+        # Pooled output port can be opened by a transmit thread
+        self.midi_port_pool.port_out_close()
+
+        # MIDI object with independent transmit timeline per port
+        midis = []
+        for port_id in dialog.get_port_ids():
+            midi = midi_backend.MIDI(verbose=self.verbose)
+            midi.set_tx_scheduler(self.midi.get_tx_scheduler().copy())
+            if not midi.port_out_open(port_id):
+                for midi in midis:
+                    midi.port_out_close()
+                messagebox.MessageBoxError(self, message='Cannot open MIDI output port {}.'.format(port_names[port_id]))
+                return
+            midis.append(midi)
+
+        dialog = SysexMultiTransmitWindow(midis=midis, sysex_buffer=self.sysex_data, parent=self)
+        if dialog.exec():
+            self.statusBar().showMessage('SYSEX transmit to {} ports completed'.format(len(midis)))
+
+        # Close MIDI ports
+        for midi in midis:
+            midi.port_out_close()
+
+    def adaptive_settings_key(self):
+        # QSettings key of learned adaptive rate per MIDI output port name
+        return 'adaptive/{}'.format(self.cmb_midi_port_out.currentText().replace('/', '_'))
+
+    def midi_transmit_settings(self):
+        dialog = TransmitSettingsDialog(self.midi.get_tx_scheduler(), adaptive=self.tx_adaptive,
+                                        adaptive_echo=self.tx_adaptive_echo, parent=self)
+        if dialog.exec():
+            self.midi.set_tx_scheduler(dialog.get_tx_scheduler())
+            self.tx_adaptive = dialog.get_adaptive()
+            self.tx_adaptive_echo = dialog.get_adaptive_echo()
+            self.statusBar().showMessage('Transmit settings changed')
+
+    def midi_receive_sysex(self):
+        # Open MIDI input port or reuse open port
+        if not self.midi_port_in_open():
+            messagebox.MessageBoxError(self, message='Cannot open MIDI input port.')
+            return
+
+        # Create custom model dialog
+        dialog = SysexReceiveWindow(midi=self.midi, parent=self)
+
+        # Wait until True (Ok / accepted) or False (Cancel / rejected) clicked
+        if dialog.exec():
+            # Get received SYSEX data
+            self.sysex_data_close()
+            self.sysex_data = midi_util.SysexBuffer(dialog.sysex_buffer)
+
+            # Add received SYSEX data to log
+            self.midi_print_sysex()
+
+            if self.sysex_data:
+                self.file_save_action.setEnabled(True)
+                self.copy_action.setEnabled(True)
+                self.select_all_action.setEnabled(True)
+                self.transmit_sysex_action.setEnabled(True)
+                self.transmit_multi_action.setEnabled(True)
+                self.statusBar().showMessage('SYSEX receive completed ({})'.format(self.midi_port_status()))
+
+    def midi_receive_sysex_multi(self):
+        # Select MIDI input ports, first combo box item is Disconnect
+        port_names = [self.cmb_midi_port_in.itemText(i) for i in range(1, self.cmb_midi_port_in.count())]
+        dialog = PortSelectDialog('Receive from multiple ports', port_names, parent=self)
+        if not dialog.exec() or not dialog.get_port_ids():
+            return
+        port_ids = dialog.get_port_ids()
+
+        # Base file name, one file per port: file-port<ID>.syx
+        path = self.settings.value('history/path', str(Path.home()))
+        if not os.path.exists(path):
+            path = str(Path.home())
+        path, _ = QFileDialog.getSaveFileName(self, 'Save files', path, 'SYSEX Files (*.syx)')
+        if not path:
+            self.statusBar().showMessage('No file selected')
+            return
+        self.settings.setValue('history/path', os.path.dirname(path))
+        sysex_files = [get_port_file_name(path, port_id) for port_id in port_ids]
+
+        # Stream received SYSEX to temporary file per port, removed again when a file or port cannot be opened
+        sysex_writers = []
+        try:
+            for sysex_file in sysex_files:
+                sysex_writers.append(midi_util.SysexFileWriter(sysex_file))
+        except OSError as err:
+            for sysex_writer in sysex_writers:
+                sysex_writer.abort()
+            messagebox.MessageBoxError(self, message='Error: {}'.format(err))
+            return
+
+        # Pooled input port can be opened by a receive thread
+        self.midi_port_pool.port_in_close()
+
+        midis = []
+        for port_id in port_ids:
+            midi = midi_backend.MIDI(verbose=self.verbose)
+            if not midi.port_in_open(port_id):
+                for midi in midis:
+                    midi.port_in_close()
+                for sysex_writer in sysex_writers:
+                    sysex_writer.abort()
+                messagebox.MessageBoxError(self, message='Cannot open MIDI input port {}.'.format(port_names[port_id]))
+                return
+            midis.append(midi)
+
+        dialog = SysexMultiReceiveWindow(midis=midis, sysex_writers=sysex_writers, parent=self)
+        dialog.exec()
+        if dialog.errors:
+            messagebox.MessageBoxError(self, message='Cannot save {}.'.format(', '.join(dialog.errors)))
+        self.statusBar().showMessage('SYSEX receive completed, {} file(s) saved'.format(len(dialog.saved_files)))
+
+        # Close MIDI ports
+        for midi in midis:
+            midi.port_in_close()
+
+    def midi_print_sysex(self):
+        # Hex view renders visible rows from SYSEX buffer
+        self.hex_view.set_buffer(self.sysex_data)
+
+    def view_log_change(self):
+        if self.view_log_action.isChecked():
+            self.hex_view.setHidden(False)
+            self.setMinimumSize(500, 300)
+            self.resize(600, 400)
+        else:
+            self.hex_view.setHidden(True)
+            self.setMinimumSize(500, 200)
+            self.resize(0, 0)
+
+    def view_statistics(self):
+        if not self.sysex_data or not self.sysex_data.size:
+            message = 'No SYSEX data loaded.\n'
+        else:
+            # Classify messages once per loaded SYSEX data
+            if not self.sysex_statistics:
+                self.sysex_statistics = sysex_devices.SysexStatistics(self.sysex_data)
+
+            message = 'SYSEX data: {}.\n'.format(bytes_to_str(self.sysex_data.size))
+            for device, sections in self.sysex_statistics.get_devices().items():
+                message += '{}:\n'.format(device)
+                for section, num_messages, num_bytes in sections:
+                    message += ' - {}{} messages, {}\n'.format('{}: '.format(section) if section else '',
+                                                               num_messages, bytes_to_str(num_bytes))
+
+        # Create resizable messagebox and show centered on window
+        messagebox.MessageBoxInfo(self, title='Statistics', message=message)
+
+    @staticmethod
+    def help_website():
+        webbrowser.open(APP_WEBSITE)
+
+    def help_about(self):
+        dialog = AboutDialog(self)
+        dialog.exec()
+
+
+def run(sysex_file=None, sysex_transmit=False, backend=None, verbose=False):
+    app = QApplication(sys.argv)
+    main_window = MainWindow(sysex_file=sysex_file,
+                             sysex_transmit=sysex_transmit,
+                             backend=backend,
+                             verbose=verbose)
+    main_window.show()
+    return app.exec()
@@ -0,0 +1,184 @@
+#
+# MIT License
+#
+# Copyright (c) 2023-2024 Erriez
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Source: https://github.com/Erriez/midi-sysex-io
+#
+
+from PySide6.QtWidgets import QAbstractScrollArea, QApplication
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QColor, QFontDatabase, QPainter
+
+# Bytes per row are a multiple of this value
+HEX_VIEW_BYTES_PER_GROUP = 8
+
+# Colors of offset column and SYSEX begin/end Bytes
+HEX_VIEW_COLOR_OFFSET = QColor('#808080')
+HEX_VIEW_COLOR_SYSEX = QColor('#0000ff')
+
+
+class SysexHexView(QAbstractScrollArea):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self._sysex_buffer = None
+        self._data = None
+        self._bytes_per_row = HEX_VIEW_BYTES_PER_GROUP
+        self._sel_anchor = None
+        self._sel_start = 0
+        self._sel_end = 0
+
+        self.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        self.setFocusPolicy(Qt.StrongFocus)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+
+    def set_buffer(self, sysex_buffer):
+        # Render directly from SYSEX buffer, no copy of the data
+        self._sysex_buffer = sysex_buffer
+        self._data = sysex_buffer.data if sysex_buffer is not None else None
+        self._sel_anchor = None
+        self._sel_start = 0
+        self._sel_end = 0
+        self.verticalScrollBar().setValue(0)
+        self._update_layout()
+
+    def clear(self):
+        self.set_buffer(None)
+
+    def _get_size(self):
+        if self._data is None:
+            return 0
+        return len(self._data)
+
+    def _get_offset_width(self):
+        # Offset column '00000000: '
+        return self.fontMetrics().horizontalAdvance('0' * 10)
+
+    def _get_byte_width(self):
+        # Hex Byte and separator '00 '
+        return self.fontMetrics().horizontalAdvance('0' * 3)
+
+    def _update_layout(self):
+        # Fit Byte groups in viewport width
+        hex_width = self.viewport().width() - self._get_offset_width()
+        groups = max(1, hex_width // (self._get_byte_width() * HEX_VIEW_BYTES_PER_GROUP))
+        self._bytes_per_row = groups * HEX_VIEW_BYTES_PER_GROUP
+
+        # Scroll per row, only the rows in the viewport are painted
+        num_rows = -(-self._get_size() // self._bytes_per_row)
+        rows_visible = max(1, self.viewport().height() // self.fontMetrics().height())
+        self.verticalScrollBar().setRange(0, max(0, num_rows - rows_visible))
+        self.verticalScrollBar().setPageStep(rows_visible)
+        self.verticalScrollBar().setSingleStep(1)
+        self.viewport().update()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_layout()
+
+    def paintEvent(self, _):
+        if not self._get_size():
+            return
+
+        painter = QPainter(self.viewport())
+        palette = self.palette()
+        metrics = self.fontMetrics()
+        row_height = metrics.height()
+        byte_width = self._get_byte_width()
+        offset_width = self._get_offset_width()
+        hex_width = metrics.horizontalAdvance('00')
+
+        first_row = self.verticalScrollBar().value()
+        rows_visible = self.viewport().height() // row_height + 1
+
+        for row in range(rows_visible):
+            offset = (first_row + row) * self._bytes_per_row
+            if offset >= self._get_size():
+                break
+            y = row * row_height
+            baseline = y + metrics.ascent()
+
+            painter.setPen(HEX_VIEW_COLOR_OFFSET)
+            painter.drawText(0, baseline, '{:08x}:'.format(offset))
+
+            row_data = self._data[offset:offset + self._bytes_per_row]
+            for i, b in enumerate(row_data):
+                x = offset_width + i * byte_width
+                if self._sel_start <= offset + i < self._sel_end:
+                    painter.fillRect(x, y, hex_width, row_height, palette.highlight())
+                    painter.setPen(palette.highlightedText().color())
+                elif b == 0xf0 or b == 0xf7:
+                    painter.setPen(HEX_VIEW_COLOR_SYSEX)
+                else:
+                    painter.setPen(palette.text().color())
+                painter.drawText(x, baseline, '{:02x}'.format(b))
+
+    def _get_offset_at(self, pos):
+        # Byte offset at viewport position
+        row = self.verticalScrollBar().value() + max(0, pos.y()) // self.fontMetrics().height()
+        column = (pos.x() - self._get_offset_width()) // self._get_byte_width()
+        column = min(max(0, column), self._bytes_per_row - 1)
+        return min(row * self._bytes_per_row + column, self._get_size() - 1)
+
+    def mousePressEvent(self, event):
+        if not self._get_size() or event.button() != Qt.LeftButton:
+            return
+        self._sel_anchor = self._get_offset_at(event.position().toPoint())
+        self._sel_start = self._sel_anchor
+        self._sel_end = self._sel_anchor + 1
+        self.viewport().update()
+
+    def mouseMoveEvent(self, event):
+        if self._sel_anchor is None:
+            return
+        pos = event.position().toPoint()
+
+        # Scroll while selecting outside the viewport
+        if pos.y() < 0:
+            self.verticalScrollBar().triggerAction(self.verticalScrollBar().SliderAction.SliderSingleStepSub)
+        elif pos.y() > self.viewport().height():
+            self.verticalScrollBar().triggerAction(self.verticalScrollBar().SliderAction.SliderSingleStepAdd)
+
+        offset = self._get_offset_at(pos)
+        self._sel_start = min(self._sel_anchor, offset)
+        self._sel_end = max(self._sel_anchor, offset) + 1
+        self.viewport().update()
+
+    def mouseReleaseEvent(self, _):
+        self._sel_anchor = None
+
+    def select_all(self):
+        self._sel_start = 0
+        self._sel_end = self._get_size()
+        self.viewport().update()
+
+    def get_selected_text(self):
+        # Selected Bytes as hex, one line per SYSEX message
+        if self._sel_start >= self._sel_end:
+            return ''
+
+        # Convert in one pass and break lines after each SYSEX end 0xf7
+        text = self._data[self._sel_start:self._sel_end].hex(' ')
+        return text.replace('f7 ', 'f7\n')
+
+    def copy(self):
+        QApplication.clipboard().setText(self.get_selected_text())
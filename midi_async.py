@@ -0,0 +1,174 @@
+# MIT License
+#
+# Copyright (c) 2023-2024 Erriez
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Source: https://github.com/Erriez/midi-sysex-io
+#
+
+
+# asyncio layer on top of the MIDI backends. Received messages are delivered from the backend input callback when
+# the backend supports it, otherwise one shared I/O thread polls all open ports, so one event loop can manage many
+# ports without a thread per port.
+
+import asyncio
+import functools
+import threading
+import time
+
+import midi_backend
+
+# Sleep time of the I/O thread when no port received a message
+MIDI_ASYNC_POLL_INTERVAL = 0.001
+
+
+class _PollThread:
+    # Polls input ports of backends without input callback and delivers messages to the event loop
+    def __init__(self):
+        # Port: lock held while the port is polled
+        self._ports = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def add(self, port):
+        with self._lock:
+            self._ports[port] = threading.Lock()
+            if not self._thread:
+                self._thread = threading.Thread(target=self._run, name='midi-async-io', daemon=True)
+                self._thread.start()
+
+    def remove(self, port):
+        # Waits for a running poll of this port only, the port can be closed afterwards
+        with self._lock:
+            poll_lock = self._ports.pop(port, None)
+        if poll_lock:
+            with poll_lock:
+                pass
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._ports:
+                    # Restarted on next add()
+                    self._thread = None
+                    return
+                ports = list(self._ports.items())
+
+            # Poll outside the port list lock, adding and removing other ports does not wait for a poll cycle
+            received = False
+            for port, poll_lock in ports:
+                with poll_lock:
+                    if port not in self._ports:
+                        # Removed after snapshot
+                        continue
+                    message = port.midi.receive_message(timeout=0)
+                if message:
+                    port._on_message(message)
+                    received = True
+
+            if not received:
+                time.sleep(MIDI_ASYNC_POLL_INTERVAL)
+
+
+_poll_thread = _PollThread()
+
+
+class AsyncMIDIPort:
+    def __init__(self, midi, loop=None):
+        self.midi = midi
+        self._loop = loop or asyncio.get_running_loop()
+        self._rx_queue = asyncio.Queue()
+        self._tx_lock = asyncio.Lock()
+        self._polled = False
+
+    def _on_message(self, message):
+        # Called from backend input thread or I/O thread
+        self._loop.call_soon_threadsafe(self._rx_queue.put_nowait, message)
+
+    def _start_receive(self):
+        if midi_backend.get_capabilities()['callback_input']:
+            self.midi.set_receive_callback(self._on_message)
+
+            # Messages received before the callback was set
+            message = self.midi.receive_message(timeout=0)
+            while message:
+                self._on_message(message)
+                message = self.midi.receive_message(timeout=0)
+        else:
+            _poll_thread.add(self)
+            self._polled = True
+
+    def _stop_receive(self):
+        if self._polled:
+            _poll_thread.remove(self)
+            self._polled = False
+        elif self.midi.is_port_in_open():
+            self.midi.set_receive_callback(None)
+
+    async def send(self, message):
+        # Write message without blocking and sleep in the event loop until it is transferred
+        if not self.midi.is_port_out_open():
+            raise OSError('MIDI output port not open')
+        async with self._tx_lock:
+            # Backends can block while writing, for example the virtual backend on a full device buffer
+            if not await self._loop.run_in_executor(None, functools.partial(self.midi.send_message, message,
+                                                                            wait=False)):
+                raise OSError('MIDI output port not open')
+            await asyncio.sleep(self.midi.get_tx_scheduler().get_delay(len(message)))
+
+    async def receive(self, timeout=None):
+        # Next received message, None on timeout
+        try:
+            return await asyncio.wait_for(self._rx_queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def messages(self, timeout=None):
+        # Received messages until no message received within timeout
+        while self.midi.is_port_in_open() or not self._rx_queue.empty():
+            message = await self.receive(timeout)
+            if message is None:
+                return
+            yield message
+
+    def close(self):
+        self._stop_receive()
+        self.midi.port_in_close()
+        self.midi.port_out_close()
+
+
+async def open_port(port_in_id=None, port_out_id=None, tx_scheduler=None, verbose=False):
+    # Create MIDI object of selected backend and open input and/or output port, raises OSError when failed
+    loop = asyncio.get_running_loop()
+    midi = midi_backend.MIDI(verbose=verbose)
+    if tx_scheduler:
+        midi.set_tx_scheduler(tx_scheduler)
+    port = AsyncMIDIPort(midi, loop)
+
+    # Opening ports can be slow, do not block the event loop
+    if port_out_id is not None and not await loop.run_in_executor(None, midi.port_out_open, port_out_id):
+        raise OSError('Cannot open MIDI output port {}'.format(port_out_id))
+    if port_in_id is not None:
+        if not await loop.run_in_executor(None, midi.port_in_open, port_in_id):
+            midi.port_out_close()
+            raise OSError('Cannot open MIDI input port {}'.format(port_in_id))
+        port._start_receive()
+
+    return port
@@ -0,0 +1,92 @@
+#
+# MIT License
+#
+# Copyright (c) 2023-2024 Erriez
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Source: https://github.com/Erriez/midi-sysex-io
+#
+
+import importlib
+
+from app_config import *
+
+# MIDI backend name: module, only the selected backend module is imported
+BACKENDS = {
+    'rtmidi': 'midi_rtmidi',
+    'pygame': 'midi_pygame',
+    # Simulated devices for testing without MIDI hardware, never selected as fallback
+    'virtual': 'midi_virtual',
+}
+
+# Backends for testing only, hidden in the GUI unless enabled in the settings
+DEV_BACKENDS = ['virtual']
+
+# Selected MIDI backend module and name
+_backend = None
+_backend_name = None
+
+
+def get_backend_names():
+    return list(BACKENDS)
+
+
+def load_backend(name=None, fallback=True):
+    global _backend, _backend_name
+
+    # Try selected backend first, then backends in order of preference
+    names = [name] if name else []
+    if fallback or not name:
+        names += [backend_name for backend_name in MIDI_BACKENDS if backend_name not in names]
+
+    errors = []
+    for backend_name in names:
+        if backend_name not in BACKENDS:
+            raise ValueError('Unknown MIDI backend "{}", available: {}'.format(backend_name,
+                                                                                 ', '.join(get_backend_names())))
+        try:
+            _backend = importlib.import_module(BACKENDS[backend_name])
+        except ImportError as e:
+            errors.append('{}: {}'.format(backend_name, e))
+            continue
+        _backend_name = backend_name
+        return _backend
+
+    raise ImportError('No MIDI backend available ({})'.format('; '.join(errors)))
+
+
+def get_backend():
+    if _backend is None:
+        load_backend()
+    return _backend
+
+
+def get_backend_name():
+    get_backend()
+    return _backend_name
+
+
+def get_capabilities():
+    return get_backend().MIDI.get_backend_capabilities()
+
+
+def MIDI(*args, **kwargs):
+    # Create MIDI object of selected backend
+    return get_backend().MIDI(*args, **kwargs)
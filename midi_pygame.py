@@ -27,33 +27,120 @@
 from os import environ
 environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
 
+import collections
 import pygame
 import pygame.midi
 import pygame.version
+import threading
 import time
 
 import midi_util
 
+# Number of PortMidi input events buffered
+MIDI_IN_BUFFER_SIZE = 1024
+
+# Maximum number of input events read at once, pygame.midi.Input.read() raises ValueError above 1024
+MIDI_IN_MAX_READ = 1024
+
+# Sleep time between input polls when no events available
+MIDI_IN_POLL_INTERVAL = 0.001
+
+# Number of open ports of all MIDI objects, PortMidi can only be reinitialized when no ports are open
+_num_open_ports = 0
+
+# PortMidi initialization, enumeration and opening ports from multiple threads, such as the GUI port watcher
+_lock = threading.RLock()
+
 
 class MIDI:
-    def __init__(self, verbose=False):
+    def __init__(self, verbose=False, buffer_size=MIDI_IN_BUFFER_SIZE):
         self._verbose = verbose
+        self._buffer_size = buffer_size
         self._midi_in = None
         self._midi_out = None
         self._midi_in_port_id = None
         self._midi_out_port_id = None
         self._midi_in_port_name = None
         self._midi_out_port_name = None
+        self._tx_scheduler = midi_util.TransmitScheduler()
+        self._rx_messages = collections.deque()
+        self._rx_sysex = None
+        self._ports_in = midi_util.PortCache()
+        self._ports_out = midi_util.PortCache()
 
-    def _init(self):
-        if not self._midi_in and not self._midi_out:
-            # Initialize PyGame MIDI
+    @staticmethod
+    def _init():
+        # PyGame MIDI stays initialized, pygame quits it at exit
+        if not pygame.midi.get_init():
             pygame.midi.init()
 
-    def _end(self):
-        if not self._midi_in and not self._midi_out:
-            # Quit PyGame MIDI
+    @staticmethod
+    def _rescan():
+        # PortMidi only detects devices during initialization
+        if not _num_open_ports and pygame.midi.get_init():
             pygame.midi.quit()
+        MIDI._init()
+
+    @staticmethod
+    def _open_port_changed(num_ports):
+        global _num_open_ports
+        _num_open_ports += num_ports
+
+    def _enumerate_ports(self, direction, refresh=False):
+        with _lock:
+            # Reinitialize PortMidi to detect new devices on refresh only
+            if refresh:
+                self._rescan()
+                # Port lists of both directions changed
+                self._ports_in.invalidate()
+                self._ports_out.invalidate()
+            else:
+                self._init()
+
+            ports = []
+            for i in range(pygame.midi.get_count()):
+                (midi_interface, midi_name, midi_input, midi_output, opened) = pygame.midi.get_device_info(i)
+                if (midi_input, midi_output)[direction]:
+                    ports.append(midi_name.decode('utf-8'))
+            return ports
+
+    @staticmethod
+    def _get_message_length(status):
+        # Number of Bytes of a non-SYSEX MIDI message
+        if status >= 0xf4:
+            return 1
+        if (status & 0xf0) in (0xc0, 0xd0) or status in (0xf1, 0xf3):
+            return 2
+        return 3
+
+    def _process_events(self, events):
+        # Reassemble 4 Bytes PortMidi events into complete MIDI messages
+        for data, _ in events:
+            status = data[0]
+
+            if status >= 0xf8:
+                # Real-time message can be interleaved with SYSEX
+                self._rx_messages.append(bytearray(data[:1]))
+                continue
+
+            if status == 0xf0:
+                # SYSEX begin
+                self._rx_sysex = bytearray()
+            elif self._rx_sysex is not None and status & 0x80 and status != 0xf7:
+                # SYSEX aborted by another status Byte
+                self._rx_sysex = None
+
+            if self._rx_sysex is None:
+                self._rx_messages.append(bytearray(data[:self._get_message_length(status)]))
+                continue
+
+            # Copy SYSEX data until end of SYSEX
+            for b in data:
+                self._rx_sysex.append(b)
+                if b == 0xf7:
+                    self._rx_messages.append(self._rx_sysex)
+                    self._rx_sysex = None
+                    break
 
     @staticmethod
     def get_backend_name():
@@ -63,6 +150,15 @@ class MIDI:
     def get_backend_version():
         return pygame.version.ver
 
+    @staticmethod
+    def get_backend_capabilities():
+        return {
+            # Input must be polled
+            'callback_input': False,
+            # PortMidi lists new devices only after reinitialization, with no ports open
+            'hotplug': False,
+        }
+
     # def print_available_ports(self):
     #     # Initialize PyGame MIDI
     #     self._init()
@@ -88,20 +184,11 @@ class MIDI:
     #     # End PyGame MIDI
     #     self._end()
 
-    def get_ports_in(self):
-        # Initialize PyGame MIDI
-        self._init()
-
-        ports = []
-        for i in range(pygame.midi.get_count()):
-            (midi_interface, midi_name, midi_input, midi_output, opened) = pygame.midi.get_device_info(i)
-            if midi_input:
-                ports.append(midi_name.decode('utf-8'))
-
-        # End PyGame MIDI
-        self._end()
-
-        return ports
+    def get_ports_in(self, refresh=False):
+        # Cached port names, enumerated again after TTL or on refresh
+        if refresh:
+            self._ports_in.invalidate()
+        return self._ports_in.get(lambda: self._enumerate_ports(0, refresh))
 
     def is_port_in_open(self):
         if self._midi_in:
@@ -112,27 +199,34 @@ class MIDI:
         if self.is_port_in_open():
             return True
 
-        # Initialize PyGame MIDI
-        self._init()
+        # Ports are opened while no other thread reinitializes PortMidi
+        with _lock:
+            # Initialize PyGame MIDI
+            self._init()
 
-        # Open MIDI input port
-        port_in_id = 0
-        for i in range(pygame.midi.get_count()):
-            (midi_interface, midi_name, midi_input, midi_output, opened) = pygame.midi.get_device_info(i)
-            if midi_input:
-                if port_id == port_in_id:
-                    # Open MIDI input port
-                    self._midi_in = pygame.midi.Input(i)
+            # Open MIDI input port
+            port_in_id = 0
+            for i in range(pygame.midi.get_count()):
+                (midi_interface, midi_name, midi_input, midi_output, opened) = pygame.midi.get_device_info(i)
+                if midi_input:
+                    if port_id == port_in_id:
+                        # Open MIDI input port
+                        self._midi_in = pygame.midi.Input(i, buffer_size=self._buffer_size)
+                        self._open_port_changed(1)
 
-                    #  Get MIDI input port id
-                    self._midi_in_port_id = port_in_id
+                        # Discard messages from a previous session
+                        self._rx_messages.clear()
+                        self._rx_sysex = None
 
-                    #  Get MIDI input port name
-                    self._midi_in_port_name = midi_name.decode('utf-8')
-                    self._midi_in_port_name += ' IN'
+                        #  Get MIDI input port id
+                        self._midi_in_port_id = port_in_id
 
-                    break
-                port_in_id += 1
+                        #  Get MIDI input port name
+                        self._midi_in_port_name = midi_name.decode('utf-8')
+                        self._midi_in_port_name += ' IN'
+
+                        break
+                    port_in_id += 1
 
         if not self._midi_in:
             return False
@@ -144,11 +238,9 @@ class MIDI:
         if self._midi_in:
             self._midi_in.close()
             self._midi_in = None
+            self._open_port_changed(-1)
         self._midi_in_port_name = None
 
-        # End PyGame MIDI
-        self._end()
-
     def get_port_in_id(self):
         if self._midi_in_port_id:
             return self._midi_in_port_id
@@ -157,20 +249,10 @@ class MIDI:
         if self._midi_in_port_name:
             return self._midi_in_port_name
 
-    def get_ports_out(self):
-        # Initialize PyGame MIDI
-        self._init()
-
-        ports = []
-        for i in range(pygame.midi.get_count()):
-            (midi_interface, midi_name, midi_input, midi_output, opened) = pygame.midi.get_device_info(i)
-            if midi_output:
-                ports.append(midi_name.decode('utf-8'))
-
-        # End PyGame MIDI
-        self._end()
-
-        return ports
+    def get_ports_out(self, refresh=False):
+        if refresh:
+            self._ports_out.invalidate()
+        return self._ports_out.get(lambda: self._enumerate_ports(1, refresh))
 
     def is_port_out_open(self):
         if self._midi_out:
@@ -181,33 +263,36 @@ class MIDI:
         if self.is_port_out_open():
             return True
 
-        # Initialize PyGame MIDI
-        self._init()
-
         # Check MIDI output port ID
         if port_id < 0:
             if self._verbose:
                 print('Error: Invalid MIDI output port ID {}'.format(port_id))
             return False
 
-        # Open MIDI output port
-        port_out_id = 0
-        for i in range(pygame.midi.get_count()):
-            (midi_interface, midi_name, midi_input, midi_output, opened) = pygame.midi.get_device_info(i)
-            if midi_output:
-                if port_out_id == port_id:
-                    # Open MIDI output port
-                    self._midi_out = pygame.midi.Output(i)
+        # Ports are opened while no other thread reinitializes PortMidi
+        with _lock:
+            # Initialize PyGame MIDI
+            self._init()
 
-                    # MIDI output port id
-                    self._midi_out_port_id = port_out_id
+            # Open MIDI output port
+            port_out_id = 0
+            for i in range(pygame.midi.get_count()):
+                (midi_interface, midi_name, midi_input, midi_output, opened) = pygame.midi.get_device_info(i)
+                if midi_output:
+                    if port_out_id == port_id:
+                        # Open MIDI output port
+                        self._midi_out = pygame.midi.Output(i)
+                        self._open_port_changed(1)
 
-                    # Get MIDI output port name
-                    self._midi_out_port_name = midi_name.decode('utf-8')
-                    self._midi_out_port_name += ' OUT'
+                        # MIDI output port id
+                        self._midi_out_port_id = port_out_id
 
-                    break
-                port_out_id += 1
+                        # Get MIDI output port name
+                        self._midi_out_port_name = midi_name.decode('utf-8')
+                        self._midi_out_port_name += ' OUT'
+
+                        break
+                    port_out_id += 1
 
         # Check if MIDI port is output
         if not self._midi_out:
@@ -215,6 +300,9 @@ class MIDI:
                 print('Error: "{}: {}" is not a MIDI output port'.format(port_id, self._midi_out_port_name))
             return False
 
+        # Start new transmit timeline
+        self._tx_scheduler.reset()
+
         # Return MIDI output port open status
         return self.is_port_out_open()
 
@@ -222,11 +310,9 @@ class MIDI:
         if self._midi_out:
             self._midi_out.close()
             self._midi_out = None
+            self._open_port_changed(-1)
         self._midi_out_port_name = None
 
-        # End PyGame MIDI
-        self._end()
-
     def get_port_out_id(self):
         if self._midi_out_port_id:
             return self._midi_out_port_id
@@ -235,7 +321,13 @@ class MIDI:
         if self._midi_out_port_name:
             return self._midi_out_port_name
 
-    def send_message(self, message):
+    def get_tx_scheduler(self):
+        return self._tx_scheduler
+
+    def set_tx_scheduler(self, tx_scheduler):
+        self._tx_scheduler = tx_scheduler
+
+    def send_message(self, message, wait=True):
         if not self.is_port_out_open():
             if self._verbose:
                 print('MIDI output port not open')
@@ -244,34 +336,55 @@ class MIDI:
         if self._verbose:
             midi_util.print_message('TX', message)
 
-        t_start = time.time()
         if message[0] == 0xf0:
-            # Write SYSEX message asynchronous to MIDI output port
-            self._midi_out.write_sys_ex(pygame.midi.time(), message)
+            # Write SYSEX message asynchronous to MIDI output port, PortMidi requires bytes or list
+            self._midi_out.write_sys_ex(pygame.midi.time(), bytes(message))
         else:
             # Write MIDI message asynchronous to MIDI output port
             self._midi_out.write(message)
 
-        # Wait until message transferred
-        wait_time = len(message) * midi_util.MIDI_BYTE_TIME
-        wait_time -= time.time() - t_start
-        if wait_time > 0:
-            time.sleep(wait_time)
+        # Wait until message transferred, without wait the caller paces with get_tx_scheduler().get_delay()
+        if wait:
+            self._tx_scheduler.wait(len(message))
 
         return True
 
-    def receive_message(self):
+    def receive_message(self, timeout=0.2):
         if not self.is_port_in_open():
             if self._verbose:
-                print('MIDI output port not open')
-            return
-
-        # Asynchronous MIDI receive
-        if self._midi_in.poll():
-            # Read one 4 Bytes MIDI message
-            message = self._midi_in.read(1)[0][0]
-
-            if self._verbose:
-                midi_util.print_message('RX', message)
+                print('MIDI input port not open')
+            return False
 
-            return message
+        # Asynchronous MIDI receive protected with a timeout
+        t_start = time.time()
+        while self.is_port_in_open():
+            if self._rx_messages:
+                message = self._rx_messages.popleft()
+
+                if self._verbose:
+                    midi_util.print_message('RX', message)
+
+                return message
+
+            try:
+                received = self._midi_in.poll()
+                if received:
+                    # Read a batch of 4 Bytes MIDI events
+                    self._process_events(self._midi_in.read(min(self._buffer_size, MIDI_IN_MAX_READ)))
+            except Exception as err:
+                # PortMidi reports pmBufferOverflow as Exception when the input buffer filled up, for example on an
+                # idle pooled port receiving active sensing. Oldest input is lost, discard incomplete SYSEX message.
+                if self._verbose:
+                    print('MIDI input error: {}'.format(err))
+                self._rx_sysex = None
+                received = False
+
+            if received:
+                continue
+            if (time.time() - t_start) < timeout:
+                time.sleep(MIDI_IN_POLL_INTERVAL)
+            else:
+                return None
+
+        # Port closed while waiting
+        return False
@@ -23,11 +23,15 @@
 # Source: https://github.com/Erriez/midi-sysex-io
 #
 
+import queue
 import rtmidi
 import sys
-import time
 import midi_util
 
+# Number of received messages queued while not read, the oldest messages are dropped when full such as MIDI clock
+# received while the pooled input port is idle
+MIDI_IN_QUEUE_SIZE = 4096
+
 
 class MIDI:
     def __init__(self, verbose=False):
@@ -38,6 +42,42 @@ class MIDI:
         self._midi_out_port_id = None
         self._midi_in_port_name = None
         self._midi_out_port_name = None
+        self._tx_scheduler = midi_util.TransmitScheduler()
+        self._rx_queue = queue.Queue(MIDI_IN_QUEUE_SIZE)
+        self._rx_callback = None
+        self._ports_in = midi_util.PortCache()
+        self._ports_out = midi_util.PortCache()
+
+    def _get_midi_in(self):
+        # One rtmidi client per direction for enumeration and ports, creating a client is slow on ALSA
+        if not self._midi_in:
+            self._midi_in = rtmidi.MidiIn()
+        return self._midi_in
+
+    def _get_midi_out(self):
+        if not self._midi_out:
+            self._midi_out = rtmidi.MidiOut()
+        return self._midi_out
+
+    def _on_midi_in_message(self, event, _):
+        # Called from rtmidi input thread: event is a tuple (message, delta time)
+        if self._rx_callback:
+            self._rx_callback(event[0])
+        else:
+            while True:
+                try:
+                    self._rx_queue.put_nowait(event[0])
+                    break
+                except queue.Full:
+                    # Drop oldest message
+                    try:
+                        self._rx_queue.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    def set_receive_callback(self, callback):
+        # Deliver received messages to callback(message) from the rtmidi input thread instead of receive_message()
+        self._rx_callback = callback
 
     @staticmethod
     def _get_rtmidi_port_name(port_name):
@@ -60,13 +100,27 @@ class MIDI:
     def get_backend_version():
         return rtmidi.get_rtmidi_version()
 
-    def get_ports_in(self):
+    @staticmethod
+    def get_backend_capabilities():
+        return {
+            # Input messages are pushed from rtmidi thread
+            'callback_input': True,
+            # New devices are listed on the next enumeration
+            'hotplug': True,
+        }
+
+    def _enumerate_ports_in(self):
         ports = []
-        midi_in = rtmidi.MidiIn()
-        for port in midi_in.get_ports(encoding='utf-8'):
+        for port in self._get_midi_in().get_ports(encoding='utf-8'):
             ports.append(self._get_rtmidi_port_name(port))
         return ports
 
+    def get_ports_in(self, refresh=False):
+        # Cached port names, enumerated again on refresh or when the number of ports changed
+        if refresh:
+            self._ports_in.invalidate()
+        return self._ports_in.get(self._enumerate_ports_in, self._get_midi_in().get_port_count())
+
     def is_port_in_open(self):
         if self._midi_in:
             return self._midi_in.is_port_open()
@@ -77,7 +131,7 @@ class MIDI:
             return True
 
         # Open MIDI in port
-        self._midi_in = rtmidi.MidiIn()
+        self._get_midi_in()
         if port_id < 0 or port_id >= self._midi_in.get_port_count():
             return False
 
@@ -90,13 +144,19 @@ class MIDI:
         # Enable SYSEX receive
         self._midi_in.ignore_types(sysex=False, timing=False)
 
+        # Discard messages from a previous session
+        self._rx_queue = queue.Queue(MIDI_IN_QUEUE_SIZE)
+
+        # Receive MIDI messages from rtmidi input thread
+        self._midi_in.set_callback(self._on_midi_in_message)
+
         # Return MIDI in port status
         return self._midi_in.open_port(port_id)
 
     def port_in_close(self):
         if self.is_port_in_open():
+            self._midi_in.cancel_callback()
             self._midi_in.close_port()
-            self._midi_in = None
         self._midi_in_port_id = None
         self._midi_in_port_name = None
 
@@ -108,13 +168,17 @@ class MIDI:
         if self._midi_in_port_name:
             return self._midi_in_port_name
 
-    def get_ports_out(self):
+    def _enumerate_ports_out(self):
         ports = []
-        midi_out = rtmidi.MidiOut()
-        for port in midi_out.get_ports(encoding='utf-8'):
+        for port in self._get_midi_out().get_ports(encoding='utf-8'):
             ports.append(self._get_rtmidi_port_name(port))
         return ports
 
+    def get_ports_out(self, refresh=False):
+        if refresh:
+            self._ports_out.invalidate()
+        return self._ports_out.get(self._enumerate_ports_out, self._get_midi_out().get_port_count())
+
     def is_port_out_open(self):
         if self._midi_out:
             return self._midi_out.is_port_open()
@@ -124,8 +188,8 @@ class MIDI:
         if self.is_port_out_open():
             return True
 
-        # Create MIDI out object
-        self._midi_out = rtmidi.MidiOut()
+        # Reuse MIDI out client
+        self._get_midi_out()
 
         # Check MIDI output port ID
         if port_id < 0 or port_id >= self._midi_out.get_port_count():
@@ -145,13 +209,15 @@ class MIDI:
                 print('Error: "{}: Cannot open MIDI output port {}'.format(port_id, self._midi_out_port_name))
             return False
 
+        # Start new transmit timeline
+        self._tx_scheduler.reset()
+
         # Return MIDI output port open status
         return self.is_port_out_open()
 
     def port_out_close(self):
         if self._midi_out:
             self._midi_out.close_port()
-            self._midi_out = None
         self._midi_out_port_id = None
         self._midi_out_port_name = None
 
@@ -163,7 +229,13 @@ class MIDI:
         if self._midi_out_port_name:
             return self._midi_out_port_name
 
-    def send_message(self, message):
+    def get_tx_scheduler(self):
+        return self._tx_scheduler
+
+    def set_tx_scheduler(self, tx_scheduler):
+        self._tx_scheduler = tx_scheduler
+
+    def send_message(self, message, wait=True):
         if not self.is_port_out_open():
             if self._verbose:
                 print('MIDI output port not open')
@@ -172,11 +244,14 @@ class MIDI:
         if self._verbose:
             midi_util.print_message('TX', message)
 
-        # Write SYSEX message asynchronous to MIDI output port
+        # Write SYSEX message asynchronous to MIDI output port, accepts any sequence such as memoryview slices
         self._midi_out.send_message(message)
 
-        # Wait until message transferred
-        time.sleep(len(message) * midi_util.MIDI_BYTE_TIME)
+        # Wait until message transferred, without wait the caller paces with get_tx_scheduler().get_delay()
+        if wait:
+            self._tx_scheduler.wait(len(message))
+
+        return True
 
     def receive_message(self, timeout=0.2):
         if not self.is_port_in_open():
@@ -184,13 +259,12 @@ class MIDI:
                 print('MIDI input port not open')
             return False
 
-        # Asynchronous MIDI receive protected with a timeout
-        t_start = time.time()
-        while self.is_port_in_open() and (time.time() - t_start) < timeout:
-            # Read one 4 Bytes MIDI message
-            message = self._midi_in.get_message()
-            if message:
-                message = message[0]
-                if self._verbose:
-                    midi_util.print_message('RX', message)
-                return message
+        # Block until a MIDI message is received from the callback or timeout
+        try:
+            message = self._rx_queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+        if self._verbose:
+            midi_util.print_message('RX', message)
+        return message
@@ -23,10 +23,43 @@
 # Source: https://github.com/Erriez/midi-sysex-io
 #
 
+from array import array
+import mmap
+import os
+import re
+import tempfile
+import time
+
 MIDI_BAUDRATE = 31250  # Maximum MIDI UART transfer speed
 MIDI_BYTES_PER_SEC = MIDI_BAUDRATE / 10  # 10 Bits per UART character
 MIDI_BYTE_TIME = 1 / MIDI_BYTES_PER_SEC
 
+# Restart transmit timeline when lagging behind more than this time
+MIDI_TX_MAX_LAG_SEC = 0.1
+
+# Adaptive transmit rate: start rate, limits, verified messages before increasing, retries and resolution
+MIDI_ADAPTIVE_BAUDRATE = MIDI_BAUDRATE // 2
+MIDI_ADAPTIVE_MIN_BAUDRATE = MIDI_BAUDRATE // 8
+MIDI_ADAPTIVE_MAX_BAUDRATE = MIDI_BAUDRATE * 32
+MIDI_ADAPTIVE_SUCCESS_COUNT = 16
+MIDI_ADAPTIVE_RETRIES = 3
+MIDI_ADAPTIVE_RESOLUTION = 0.05
+MIDI_ADAPTIVE_ECHO_TIMEOUT_SEC = 0.5
+
+# Enumerated MIDI port lists are reused until this age
+MIDI_PORT_CACHE_TTL_SEC = 5.0
+
+# Streaming SYSEX file writer buffer size and flush to disk interval
+SYSEX_FILE_BUFFER_SIZE = 64 * 1024
+SYSEX_FILE_FLUSH_SEC = 1.0
+
+# SYSEX begin of a next message and real-time Bytes interrupting a SYSEX message
+_SYSEX_STATUS = re.compile(rb'[\xf0\xf8-\xff]')
+
+# Process umask read once at import, os.umask() changes it for all threads
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
 
 def print_message(msg, data):
     line = '{} ({}): '.format(msg, len(data))
@@ -35,17 +68,428 @@ def print_message(msg, data):
     print(line)
 
 
-def get_sysex_message(offset, data):
-    tx_chunk = bytearray()
+def is_sysex_nak(message):
+    # Universal non-realtime NAK: f0 7e <device id> 7f <packet> f7
+    return len(message) >= 5 and message[0] == 0xf0 and message[1] == 0x7e and message[3] == 0x7f
+
+
+def verify_transmit(midi, message, echo=False, timeout=MIDI_ADAPTIVE_ECHO_TIMEOUT_SEC, sysex_reassembler=None):
+    # Wait for echo of transmitted message (loopback or MIDI thru), or check for NAK replies only
+    # Returns True when echo received, False on NAK or missing echo, None when not verified without echo
+    # Without echo a NAK may belong to an earlier message, it can only lower the rate
+    # Received fragments are reassembled, pass the same sysex_reassembler for each message to keep a fragment received
+    # after the previous check
+    if sysex_reassembler is None:
+        sysex_reassembler = SysexReassembler()
+    t_end = time.monotonic() + (timeout if echo else 0)
+    while True:
+        rx_data = midi.receive_message(timeout=max(0.0, t_end - time.monotonic()))
+        if not rx_data:
+            # Timeout or input port not open: echo missing, or no error reply received
+            return False if echo else None
+        if not sysex_reassembler.feed(rx_data):
+            continue
+        for rx_message in SysexBuffer(sysex_reassembler.take()):
+            if is_sysex_nak(rx_message):
+                return False
+            if echo and rx_message == message:
+                return True
+
+
+class AdaptiveRate:
+    def __init__(self, baudrate=MIDI_ADAPTIVE_BAUDRATE, min_baudrate=MIDI_ADAPTIVE_MIN_BAUDRATE,
+                 max_baudrate=MIDI_ADAPTIVE_MAX_BAUDRATE):
+        self.baudrate = baudrate
+        self._min_baudrate = min_baudrate
+        self._max_baudrate = max_baudrate
+        self._good_baudrate = None
+        self._bad_baudrate = None
+        self._successes = 0
+
+    @property
+    def converged(self):
+        if self._good_baudrate is None:
+            return False
+        if self._good_baudrate >= self._max_baudrate:
+            return True
+        return self._bad_baudrate is not None and \
+            (self._bad_baudrate - self._good_baudrate) <= self._good_baudrate * MIDI_ADAPTIVE_RESOLUTION
+
+    def get_learned_baudrate(self):
+        # Fastest verified rate
+        return self._good_baudrate
+
+    def on_success(self):
+        # Call for positively verified messages only, raises the rate
+        self._successes += 1
+        if self._successes < MIDI_ADAPTIVE_SUCCESS_COUNT:
+            return
+        self._successes = 0
+
+        # Current rate is safe, try faster until converged
+        self._good_baudrate = max(self._good_baudrate or 0, self.baudrate)
+        if self.converged:
+            self.baudrate = self._good_baudrate
+        elif self._bad_baudrate is None:
+            self.baudrate = min(self.baudrate * 2, self._max_baudrate)
+        else:
+            self.baudrate = (self._good_baudrate + self._bad_baudrate) // 2
+
+    def on_error(self):
+        self._successes = 0
+
+        # Current rate is too fast, fall back to fastest verified rate
+        self._bad_baudrate = min(self._bad_baudrate or self.baudrate, self.baudrate)
+        if self._good_baudrate is not None and self._good_baudrate >= self._bad_baudrate:
+            # A verified rate failed, device needs more slack than learned before
+            self._good_baudrate = None
+        if self._good_baudrate is not None:
+            self.baudrate = self._good_baudrate
+        else:
+            self.baudrate = max(self.baudrate // 2, self._min_baudrate)
+
+
+class PortCache:
+    def __init__(self, ttl=MIDI_PORT_CACHE_TTL_SEC, clock=time.monotonic):
+        self._ttl = ttl
+        self._clock = clock
+        self._ports = None
+        self._t_update = 0
+
+    def invalidate(self):
+        # Enumerate on next get(), for example on explicit refresh when a device was replaced by another one
+        self._ports = None
+
+    def get(self, enumerate_ports, num_ports=None):
+        # Enumerate when invalidated, expired or when the backend reports a different number of ports
+        if self._ports is None or self._clock() - self._t_update > self._ttl or \
+                (num_ports is not None and num_ports != len(self._ports)):
+            self._ports = enumerate_ports()
+            self._t_update = self._clock()
+        return list(self._ports)
+
+
+class MidiPortPool:
+    def __init__(self, midi, verbose=False):
+        # Keeps ports of a MIDI object open between transfers while the same port names are selected
+        self.midi = midi
+        self._verbose = verbose
+        self._port_in_name = None
+        self._port_out_name = None
+        self.num_in_opens = 0
+        self.num_in_reuses = 0
+        self.num_out_opens = 0
+        self.num_out_reuses = 0
+
+    def set_midi(self, midi):
+        # Ports of previous MIDI object are closed
+        self.close()
+        self.midi = midi
+
+    def port_in_open(self, port_id, port_name):
+        if self._port_in_name == port_name and self.midi.is_port_in_open():
+            # Discard messages received between transfers
+            while self.midi.receive_message(timeout=0):
+                pass
+            self.num_in_reuses += 1
+            return True
+
+        self.port_in_close()
+        if not self.midi.port_in_open(port_id):
+            return False
+        self._port_in_name = port_name
+        self.num_in_opens += 1
+        if self._verbose:
+            print('MIDI IN "{}" opened'.format(port_name))
+        return True
+
+    def port_in_close(self):
+        self.midi.port_in_close()
+        self._port_in_name = None
+
+    def port_out_open(self, port_id, port_name):
+        if self._port_out_name == port_name and self.midi.is_port_out_open():
+            # Start new transmit timeline
+            self.midi.get_tx_scheduler().reset()
+            self.num_out_reuses += 1
+            return True
+
+        self.port_out_close()
+        if not self.midi.port_out_open(port_id):
+            return False
+        self._port_out_name = port_name
+        self.num_out_opens += 1
+        if self._verbose:
+            print('MIDI OUT "{}" opened'.format(port_name))
+        return True
+
+    def port_out_close(self):
+        self.midi.port_out_close()
+        self._port_out_name = None
+
+    def select(self, port_in_name, port_out_name):
+        # Close ports which are not selected anymore
+        if self._port_in_name is not None and self._port_in_name != port_in_name:
+            self.port_in_close()
+        if self._port_out_name is not None and self._port_out_name != port_out_name:
+            self.port_out_close()
+
+    def close(self):
+        self.port_in_close()
+        self.port_out_close()
+
+    def get_statistics(self):
+        return {
+            'in_opens': self.num_in_opens,
+            'in_reuses': self.num_in_reuses,
+            'out_opens': self.num_out_opens,
+            'out_reuses': self.num_out_reuses,
+        }
+
+
+class TransmitScheduler:
+    def __init__(self, baudrate=MIDI_BAUDRATE, gap=0.0, min_delay=0.0, clock=time.perf_counter, sleep=time.sleep):
+        # Link rate in baud, gap and minimum delay between messages in seconds
+        if baudrate <= 0 or gap < 0 or min_delay < 0:
+            raise ValueError('Invalid transmit timing: {} baud, gap {} s, minimum delay {} s'.format(
+                baudrate, gap, min_delay))
+        self.baudrate = baudrate
+        self.gap = gap
+        self.min_delay = min_delay
+        self._clock = clock
+        self._sleep = sleep
+        self._deadline = None
+
+    @property
+    def byte_time(self):
+        # 10 Bits per UART character
+        return 10 / self.baudrate
+
+    def reset(self):
+        self._deadline = None
+
+    def copy(self):
+        # Independent transmit timeline with the same settings, for example one per MIDI port
+        return TransmitScheduler(baudrate=self.baudrate, gap=self.gap, min_delay=self.min_delay, clock=self._clock,
+                                 sleep=self._sleep)
+
+    def get_delay(self, num_bytes):
+        now = self._clock()
+
+        # Start a new timeline when idle or lagging behind, instead of bursting to catch up
+        if self._deadline is None or (now - self._deadline) > MIDI_TX_MAX_LAG_SEC:
+            self._deadline = now
+
+        # Advance cumulative timeline so sleep overshoot is compensated by the next message
+        self._deadline = max(self._deadline + num_bytes * self.byte_time + self.gap, now + self.min_delay)
+
+        return self._deadline - now
+
+    def wait(self, num_bytes):
+        # Wait until message transferred
+        delay = self.get_delay(num_bytes)
+        if delay > 0:
+            self._sleep(delay)
+
+    def get_transfer_time(self, num_bytes, num_messages):
+        # Estimated transfer time in seconds
+        return max(num_bytes * self.byte_time + num_messages * self.gap, num_messages * self.min_delay)
+
+
+class SysexBuffer:
+    def __init__(self, data, path=None):
+        # Path of memory mapped file, None for data in memory
+        self.path = path
+        self._data = data
+        self._view = memoryview(data)
+
+        # Message start and end offsets, end offset is exclusive
+        self._starts = array('Q')
+        self._ends = array('Q')
+
+        # Scan buffer once for SYSEX 0xf0 ... 0xf7 messages
+        offset = 0
+        while True:
+            start = data.find(b'\xf0', offset)
+            if start < 0:
+                break
+            end = data.find(b'\xf7', start + 1)
+            if end < 0:
+                break
+            self._starts.append(start)
+            self._ends.append(end + 1)
+            offset = end + 1
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __getitem__(self, index):
+        # Zero-copy message slice
+        return self._view[self._starts[index]:self._ends[index]]
+
+    def __iter__(self):
+        for index in range(len(self._starts)):
+            yield self[index]
+
+    @property
+    def data(self):
+        return self._view
+
+    @property
+    def size(self):
+        return len(self._view)
+
+    def is_valid(self):
+        return self.size >= 2 and self._view[0] == 0xf0 and self._view[-1] == 0xf7
+
+    def close(self):
+        # Release memory mapped file, postponed to garbage collection when slices are still in use
+        # Returns False when the file is still mapped
+        try:
+            self._view.release()
+            if isinstance(self._data, mmap.mmap):
+                self._data.close()
+        except BufferError:
+            return False
+        return True
+
+
+def open_sysex_file(path):
+    # Memory map SYSEX file read-only instead of reading it into memory
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files cannot be mapped
+            return SysexBuffer(bytes())
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    return SysexBuffer(data, path)
+
+
+class SysexReassembler:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        # Discard received data and counters, for example before the next receive
+        self._buffer = bytearray()
+        self._num_complete = 0
+        self._rx_sysex_data = False
+        self.num_messages = 0
+        self.num_bytes = 0
+        # SYSEX messages restarted by a SYSEX begin before SYSEX end
+        self.num_truncated = 0
+
+    def feed(self, chunk):
+        # Convert received chunk once, find() and search() operate on the whole chunk
+        chunk = bytes(chunk)
+        num_messages = 0
+
+        offset = 0
+        end = -1
+        while offset < len(chunk):
+            if not self._rx_sysex_data:
+                # Skip data until SYSEX begin
+                offset = chunk.find(b'\xf0', offset)
+                if offset < 0:
+                    break
+                self._buffer.append(0xf0)
+                self._rx_sysex_data = True
+                offset += 1
+
+            # Find end of SYSEX once per message, not again after skipped real-time bytes
+            if end < offset:
+                end = chunk.find(b'\xf7', offset)
+                if end < 0:
+                    end = len(chunk)
+            data = chunk[offset:end]
+
+            # Data Bytes are below 0x80, search status Bytes only when present
+            if not data.isascii():
+                match = _SYSEX_STATUS.search(chunk, offset, end)
+                if match is not None:
+                    status_offset = match.start()
+                    self._buffer += chunk[offset:status_offset]
+                    offset = status_offset + 1
+                    if chunk[status_offset] == 0xf0:
+                        # SYSEX end missing, drop truncated message and restart
+                        del self._buffer[self._num_complete:]
+                        self._buffer.append(0xf0)
+                        self.num_truncated += 1
+                    # Real-time messages such as MIDI clock are skipped
+                    continue
+
+            # Copy SYSEX data until end of SYSEX
+            self._buffer += data
+            offset = end + 1
+            if end == len(chunk):
+                break
+            self._buffer.append(0xf7)
+            self.num_bytes += len(self._buffer) - self._num_complete
+            self._num_complete = len(self._buffer)
+            self._rx_sysex_data = False
+            num_messages += 1
+
+        self.num_messages += num_messages
+        return num_messages
+
+    @property
+    def receiving(self):
+        # SYSEX message in progress
+        return self._rx_sysex_data
+
+    @property
+    def size(self):
+        # Total number of Bytes of completed SYSEX messages
+        return self.num_bytes
+
+    def get_data(self, start=0):
+        # Completed SYSEX messages not yet taken, optionally from offset start
+        with memoryview(self._buffer) as view:
+            return bytes(view[start:self._num_complete])
+
+    def take(self):
+        # Remove completed SYSEX messages from buffer, keep incomplete message
+        data = self.get_data()
+        del self._buffer[:self._num_complete]
+        self._num_complete = 0
+        return data
+
+
+class SysexFileWriter:
+    def __init__(self, path, buffer_size=SYSEX_FILE_BUFFER_SIZE, flush_interval=SYSEX_FILE_FLUSH_SEC):
+        self.path = os.path.abspath(path)
+        self.size = 0
+        self._flush_interval = flush_interval
+
+        # Write to temporary file in destination directory, renamed on close
+        fd, self._tmp_path = tempfile.mkstemp(prefix='.{}.'.format(os.path.basename(self.path)),
+                                              suffix='.tmp',
+                                              dir=os.path.dirname(self.path))
+        self._file = os.fdopen(fd, 'wb', buffering=buffer_size)
+        self._t_flush = time.monotonic()
+
+        # Temporary files are created private, apply default file permissions
+        os.chmod(self._tmp_path, 0o666 & ~_UMASK)
+
+    def write(self, data):
+        self._file.write(data)
+        self.size += len(data)
+
+        # Periodically flush received data to disk
+        if (time.monotonic() - self._t_flush) >= self._flush_interval:
+            self.flush()
+
+    def flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._t_flush = time.monotonic()
 
-    sysex_data = False
-    for i in range(offset, len(data)):
-        b = data[i]
-        if b == 0xf0:
-            sysex_data = True
-        if sysex_data:
-            tx_chunk.append(b)
-        if b == 0xf7:
-            return i + 1, tx_chunk
+    def close(self):
+        # Flush and replace destination file atomically
+        self.flush()
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
 
-    return None, None
+    def abort(self):
+        self._file.close()
+        os.remove(self._tmp_path)
@@ -0,0 +1,356 @@
+# MIT License
+#
+# Copyright (c) 2023-2024 Erriez
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Source: https://github.com/Erriez/midi-sysex-io
+#
+
+
+# In-process virtual MIDI devices for testing without MIDI hardware. Models MIDI wire time, a host interface buffer
+# blocking the sender, a finite device input buffer with overflow drops, fragmentation of SYSEX received by the host
+# and scripted replies to dump requests.
+
+import heapq
+import itertools
+import threading
+import time
+
+import midi_util
+
+# Host MIDI interface transmit buffer and device input buffer sizes in Bytes
+VIRTUAL_TX_BUFFER_SIZE = 4096
+VIRTUAL_RX_BUFFER_SIZE = 1024
+
+# Maximum sleep while waiting for input, other threads can push device messages
+VIRTUAL_POLL_INTERVAL = 0.01
+
+
+class RealClock:
+    @staticmethod
+    def time():
+        return time.perf_counter()
+
+    @staticmethod
+    def sleep(seconds):
+        time.sleep(seconds)
+
+
+class VirtualClock:
+    # Deterministic clock, sleep advances time immediately. Intended for single threaded measurements.
+    def __init__(self):
+        self._now = 0.0
+
+    def time(self):
+        return self._now
+
+    def sleep(self, seconds):
+        self._now += max(0.0, seconds)
+
+
+clock = RealClock()
+
+
+def set_clock(new_clock):
+    global clock
+    clock = new_clock
+
+
+class VirtualDevice:
+    def __init__(self, name, baudrate=midi_util.MIDI_BAUDRATE, process_rate=None,
+                 tx_buffer_size=VIRTUAL_TX_BUFFER_SIZE, rx_buffer_size=VIRTUAL_RX_BUFFER_SIZE,
+                 fragment_size=None, reply_delay=0.0, echo=False):
+        self.name = name
+
+        # Wire rate, device processing rate in Bytes/s (None is as fast as the wire)
+        self.baudrate = baudrate
+        self.process_rate = process_rate
+
+        # Host interface transmit buffer and device input buffer in Bytes
+        self.tx_buffer_size = tx_buffer_size
+        self.rx_buffer_size = rx_buffer_size
+
+        # Split messages to host in fragments of this size in Bytes (None is complete messages)
+        self.fragment_size = fragment_size
+
+        # Scripted replies: request message prefix -> list of reply messages
+        self.replies = {}
+        self.reply_delay = reply_delay
+
+        # Send received messages back to host like MIDI thru or a loopback cable
+        self.echo = echo
+
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # Received messages and statistics
+            self.received = []
+            self.rx_messages = 0
+            self.rx_bytes = 0
+            self.rx_drops = 0
+
+            # Time host interface output and device output wire is free
+            self._wire_in_free = 0.0
+            self._wire_out_free = 0.0
+
+            # Device input buffer fill level in Bytes at time
+            self._rx_fill = 0
+            self._t_rx_fill = 0.0
+
+            # Messages to host: heap of (available time, sequence, fragment)
+            self._host_queue = []
+
+    @property
+    def byte_time(self):
+        return 10 / self.baudrate
+
+    def add_reply(self, request, replies):
+        self.replies[bytes(request)] = [bytes(reply) for reply in replies]
+
+    def host_send(self, message, now):
+        # Message from host MIDI output port to device, returns time the host interface accepted the last Byte
+        message = bytes(message)
+        with self._lock:
+            # Host interface buffers and transmits on the wire, the host blocks while its buffer is full
+            wire_start = max(self._wire_in_free, now)
+            backlog = (wire_start - now) / self.byte_time
+            t_accepted = now + max(0, backlog + len(message) - self.tx_buffer_size) * self.byte_time
+            self._wire_in_free = wire_start + len(message) * self.byte_time
+            t_arrival = self._wire_in_free
+
+            # Device input buffer fills at wire rate while the message arrives and drains at its processing rate,
+            # drop when buffer overflows. A device as fast as the wire never overflows.
+            if self.process_rate and self.process_rate * self.byte_time < 1:
+                drained = (wire_start - self._t_rx_fill) * self.process_rate
+                rx_fill = max(0, self._rx_fill - drained) + len(message) * (1 - self.process_rate * self.byte_time)
+                self._t_rx_fill = t_arrival
+                if rx_fill > self.rx_buffer_size:
+                    # Bytes not fitting in the full buffer are lost
+                    self._rx_fill = self.rx_buffer_size
+                    self.rx_drops += 1
+                    return t_accepted
+                self._rx_fill = rx_fill
+            else:
+                self._rx_fill = 0
+                self._t_rx_fill = t_arrival
+
+            # Message processed by device
+            t_processed = t_arrival + (self._rx_fill / self.process_rate if self.process_rate else 0)
+            self.received.append(message)
+            self.rx_messages += 1
+            self.rx_bytes += len(message)
+
+            # Reply to dump requests and echo
+            replies = []
+            for request, request_replies in self.replies.items():
+                if message.startswith(request):
+                    replies += request_replies
+            if self.echo:
+                replies.append(message)
+            for reply in replies:
+                self._schedule(reply, t_processed + self.reply_delay)
+
+            return t_accepted
+
+    def send(self, messages, now=None):
+        # Device transmits messages to host, for example a dump triggered on the front panel
+        with self._lock:
+            t_start = clock.time() if now is None else now
+            for message in messages:
+                self._schedule(bytes(message), t_start)
+
+    def _schedule(self, message, t_start):
+        # Device output wire, each fragment is available when its last Byte arrived
+        offset = max(self._wire_out_free, t_start)
+        fragment_size = self.fragment_size or len(message)
+        for i in range(0, len(message), fragment_size):
+            fragment = message[i:i + fragment_size]
+            offset += len(fragment) * self.byte_time
+            heapq.heappush(self._host_queue, (offset, next(self._sequence), fragment))
+        self._wire_out_free = offset
+
+    def host_receive(self, now):
+        # Next fragment available to host, or time next fragment is available
+        with self._lock:
+            if not self._host_queue:
+                return None, None
+            t_available = self._host_queue[0][0]
+            if t_available > now:
+                return None, t_available
+            return heapq.heappop(self._host_queue)[2], None
+
+
+devices = [VirtualDevice('Virtual MIDI 1')]
+
+
+def add_device(name, **kwargs):
+    device = VirtualDevice(name, **kwargs)
+    devices.append(device)
+    return device
+
+
+class MIDI:
+    def __init__(self, verbose=False):
+        self._verbose = verbose
+        self._midi_in = None
+        self._midi_out = None
+        self._midi_in_port_id = None
+        self._midi_out_port_id = None
+        self._tx_scheduler = None
+        self.set_tx_scheduler(midi_util.TransmitScheduler())
+
+    @staticmethod
+    def get_backend_name():
+        return 'virtual'
+
+    @staticmethod
+    def get_backend_version():
+        return '1.0'
+
+    @staticmethod
+    def get_backend_capabilities():
+        return {
+            # Input is polled from the device queue
+            'callback_input': False,
+            # Added devices are listed on the next enumeration
+            'hotplug': True,
+        }
+
+    @staticmethod
+    def get_ports_in(refresh=False):
+        return [device.name for device in devices]
+
+    def is_port_in_open(self):
+        return self._midi_in is not None
+
+    def port_in_open(self, port_id):
+        if self.is_port_in_open():
+            return True
+        if port_id < 0 or port_id >= len(devices):
+            return False
+        self._midi_in = devices[port_id]
+        self._midi_in_port_id = port_id
+        return True
+
+    def port_in_close(self):
+        self._midi_in = None
+        self._midi_in_port_id = None
+
+    def get_port_in_id(self):
+        return self._midi_in_port_id
+
+    def get_port_in_name(self):
+        if self._midi_in:
+            return self._midi_in.name
+
+    @staticmethod
+    def get_ports_out(refresh=False):
+        return [device.name for device in devices]
+
+    def is_port_out_open(self):
+        return self._midi_out is not None
+
+    def port_out_open(self, port_id):
+        if self.is_port_out_open():
+            return True
+        if port_id < 0 or port_id >= len(devices):
+            if self._verbose:
+                print('Error: Invalid MIDI output port ID {}'.format(port_id))
+            return False
+        self._midi_out = devices[port_id]
+        self._midi_out_port_id = port_id
+
+        # Start new transmit timeline
+        self._tx_scheduler.reset()
+
+        return True
+
+    def port_out_close(self):
+        self._midi_out = None
+        self._midi_out_port_id = None
+
+    def get_port_out_id(self):
+        return self._midi_out_port_id
+
+    def get_port_out_name(self):
+        if self._midi_out:
+            return self._midi_out.name
+
+    def get_tx_scheduler(self):
+        return self._tx_scheduler
+
+    def set_tx_scheduler(self, tx_scheduler):
+        # Pace with the virtual devices clock
+        self._tx_scheduler = midi_util.TransmitScheduler(baudrate=tx_scheduler.baudrate,
+                                                         gap=tx_scheduler.gap,
+                                                         min_delay=tx_scheduler.min_delay,
+                                                         clock=lambda: clock.time(),
+                                                         sleep=lambda seconds: clock.sleep(seconds))
+
+    def send_message(self, message, wait=True):
+        if not self.is_port_out_open():
+            if self._verbose:
+                print('MIDI output port not open')
+            return False
+
+        if self._verbose:
+            midi_util.print_message('TX', message)
+
+        # Block while host interface buffer is full
+        now = clock.time()
+        t_accepted = self._midi_out.host_send(message, now)
+        if t_accepted > now:
+            clock.sleep(t_accepted - now)
+
+        # Wait until message transferred, without wait the caller paces with get_tx_scheduler().get_delay()
+        if wait:
+            self._tx_scheduler.wait(len(message))
+
+        return True
+
+    def receive_message(self, timeout=0.2):
+        if not self.is_port_in_open():
+            if self._verbose:
+                print('MIDI input port not open')
+            return False
+
+        t_end = clock.time() + timeout
+        while self.is_port_in_open():
+            now = clock.time()
+            message, t_available = self._midi_in.host_receive(now)
+            if message is not None:
+                if self._verbose:
+                    midi_util.print_message('RX', message)
+                return list(message)
+
+            if now >= t_end:
+                return None
+
+            # Sleep until next fragment available or timeout
+            wait = min(t_end, t_available or t_end) - now
+            if isinstance(clock, RealClock):
+                wait = min(wait, VIRTUAL_POLL_INTERVAL)
+            clock.sleep(wait)
+
+        # Port closed while waiting
+        return False
@@ -0,0 +1,249 @@
+#
+# MIT License
+#
+# Copyright (c) 2023-2024 Erriez
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Source: https://github.com/Erriez/midi-sysex-io
+#
+
+from array import array
+
+# KN2000 dump format, see README.md section KN2000 format: start messages, sections each terminated by the end
+# message, followed by one more end message
+SYSEX_KN2000 = bytes([0xf0, 0x50, 0x21, 0x01, 0x18, 0x10, 0xf7])
+SYSEX_KN2000_PNL = bytes([0xf0, 0x50, 0x2d, 0x01, 0x18, 0x10, 0x40])
+SYSEX_KN2000_SND = bytes([0xf0, 0x50, 0x2d, 0x01, 0x18, 0x10, 0x30])
+SYSEX_KN2000_CMP = bytes([0xf0, 0x50, 0x2d, 0x01, 0x18, 0x10, 0x50])
+SYSEX_KN2000_SEQ = bytes([0xf0, 0x50, 0x2d, 0x01, 0x18, 0x10, 0x60])
+SYSEX_KN2000_END = bytes([0xf0, 0x50, 0x27, 0x7e, 0xf7])
+
+# Universal non-realtime identity request to all devices, replied with one identity reply message
+SYSEX_IDENTITY_REQUEST = bytes([0xf0, 0x7e, 0x7f, 0x06, 0x01, 0xf7])
+
+DEVICE_UNKNOWN = 'Unknown'
+
+# MIDI manufacturer SYSEX IDs, 3 Bytes IDs start with 0x00
+MANUFACTURERS = {
+    bytes([0x01]): 'Sequential Circuits',
+    bytes([0x04]): 'Moog',
+    bytes([0x06]): 'Lexicon',
+    bytes([0x07]): 'Kurzweil',
+    bytes([0x0f]): 'Ensoniq',
+    bytes([0x10]): 'Oberheim',
+    bytes([0x18]): 'E-mu',
+    bytes([0x40]): 'Kawai',
+    bytes([0x41]): 'Roland',
+    bytes([0x42]): 'Korg',
+    bytes([0x43]): 'Yamaha',
+    bytes([0x44]): 'Casio',
+    bytes([0x47]): 'Akai',
+    bytes([0x50]): 'Technics',
+    bytes([0x7d]): 'Non-commercial',
+    bytes([0x7e]): 'Universal non-realtime',
+    bytes([0x7f]): 'Universal realtime',
+    bytes([0x00, 0x20, 0x29]): 'Novation',
+    bytes([0x00, 0x20, 0x32]): 'Behringer',
+    bytes([0x00, 0x20, 0x33]): 'Access',
+}
+
+
+def get_manufacturer(message):
+    # Manufacturer ID follows SYSEX begin 0xf0
+    if len(message) > 1 and message[1] == 0x00:
+        manufacturer_id = bytes(message[1:4])
+    else:
+        manufacturer_id = bytes(message[1:2])
+    return MANUFACTURERS.get(manufacturer_id, DEVICE_UNKNOWN)
+
+
+class SignatureRegistry:
+    def __init__(self):
+        # Message header -> (device, section)
+        self._signatures = {}
+        self._header_lengths = []
+
+    def register(self, device, section, header):
+        self._signatures[bytes(header)] = (device, section)
+        if len(header) not in self._header_lengths:
+            # Longest header matches first
+            self._header_lengths.append(len(header))
+            self._header_lengths.sort(reverse=True)
+
+    def match(self, message):
+        # Dictionary lookup of message header, fall back to manufacturer ID
+        for length in self._header_lengths:
+            signature = self._signatures.get(bytes(message[:length]))
+            if signature:
+                return signature
+        return get_manufacturer(message), None
+
+
+registry = SignatureRegistry()
+
+
+class DeviceProfile:
+    def __init__(self, name, device, sections, start=None, end=None, section_end=None, expected_messages=None,
+                 request=None):
+        # Structure of a device dump, used to complete receive as soon as the dump is complete:
+        #   sections: list of (section, message header), without sections all messages are part of the dump
+        #   start: Optional message header starting the dump
+        #   end: Optional terminating message header, dump complete when received outside a section
+        #   section_end: Optional message header terminating each section
+        #   expected_messages: Optional number of messages in a complete dump
+        #   request: Optional SYSEX message requesting the dump (commandline --request)
+        self.name = name
+        self.device = device
+        self.sections = sections
+        self.start = start
+        self.end = end
+        self.section_end = section_end
+        self.expected_messages = expected_messages
+        self.request = request
+
+    def get_headers(self):
+        # List of (section, message header) including start and end
+        headers = []
+        if self.start:
+            headers.append(('Start', self.start))
+        headers += self.sections
+        if self.section_end and self.section_end != self.end:
+            headers.append(('Section end', self.section_end))
+        if self.end:
+            headers.append(('End', self.end))
+        return headers
+
+    def match(self, message):
+        # Section of message, None when message is not part of this device dump
+        for section, header in self.get_headers():
+            if message[:len(header)] == header:
+                return section
+        return None
+
+
+# Profile name -> DeviceProfile
+profiles = {}
+
+
+def register_profile(profile):
+    # Register profile and its message headers for statistics
+    profiles[profile.name] = profile
+    for section, header in profile.get_headers():
+        registry.register(profile.device, section, header)
+
+
+register_profile(DeviceProfile('kn2000', 'Technics KN2000',
+                               sections=[('Panel memory', SYSEX_KN2000_PNL),
+                                         ('Sound memory', SYSEX_KN2000_SND),
+                                         ('Composer', SYSEX_KN2000_CMP),
+                                         ('Sequencer', SYSEX_KN2000_SEQ)],
+                               start=SYSEX_KN2000,
+                               end=SYSEX_KN2000_END,
+                               section_end=SYSEX_KN2000_END))
+register_profile(DeviceProfile('identity', 'Identity', sections=[], expected_messages=1,
+                               request=SYSEX_IDENTITY_REQUEST))
+
+
+class DumpDetector:
+    def __init__(self, profile=None):
+        # Detect structurally complete dump of profile, or of the first registered profile matching a message
+        self.profile = profile
+        self.sections = []
+        self.section_open = False
+        self.num_messages = 0
+        self.complete = False
+
+    def feed(self, message):
+        # Feed one received SYSEX message, returns True when the dump is complete
+        if self.complete:
+            return True
+
+        if self.profile is None:
+            # Auto detect profile by first matching message
+            for profile in profiles.values():
+                if profile.match(message):
+                    self.profile = profile
+                    break
+            else:
+                return False
+
+        section = self.profile.match(message)
+        if section is None and not self.num_messages and self.profile.get_headers():
+            # Messages before the dump starts are not counted
+            return False
+        self.num_messages += 1
+
+        # Sections in order of first appearance, each open until its section end message
+        section_end = self.profile.section_end
+        if section_end and message[:len(section_end)] == section_end and self.section_open:
+            self.section_open = False
+        elif self.profile.end and message[:len(self.profile.end)] == self.profile.end:
+            self.complete = True
+        elif section in [name for name, _ in self.profile.sections]:
+            self.section_open = True
+            if section not in self.sections:
+                self.sections.append(section)
+        if self.profile.expected_messages and self.num_messages >= self.profile.expected_messages:
+            self.complete = True
+        return self.complete
+
+    def feed_data(self, data):
+        # Feed completed SYSEX messages, returns True when the dump is complete
+        begin = 0
+        while begin < len(data):
+            end = data.find(b'\xf7', begin) + 1
+            if not end:
+                break
+            if self.feed(data[begin:end]):
+                return True
+            begin = end
+        return self.complete
+
+
+class SysexStatistics:
+    def __init__(self, sysex_buffer, signature_registry=registry):
+        # Classification index per message into signatures
+        self.signatures = []
+        self.classification = array('H')
+
+        # (device, section) -> [messages, Bytes]
+        self.totals = {}
+
+        # Match all messages in one pass over the message index
+        signature_ids = {}
+        for message in sysex_buffer:
+            signature = signature_registry.match(message)
+            signature_id = signature_ids.get(signature)
+            if signature_id is None:
+                signature_id = len(self.signatures)
+                signature_ids[signature] = signature_id
+                self.signatures.append(signature)
+                self.totals[signature] = [0, 0]
+            self.classification.append(signature_id)
+            total = self.totals[signature]
+            total[0] += 1
+            total[1] += len(message)
+
+    def get_devices(self):
+        # Device -> list of (section, messages, Bytes) in order of first appearance
+        devices = {}
+        for (device, section), (num_messages, num_bytes) in self.totals.items():
+            devices.setdefault(device, []).append((section, num_messages, num_bytes))
+        return devices
@@ -0,0 +1,303 @@
+# MIT License
+#
+# Copyright (c) 2023-2024 Erriez
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Source: https://github.com/Erriez/midi-sysex-io
+#
+
+
+# Headless SYSEX transfer session without Qt, progress bar or process exit. The commandline and GUI are thin wrappers
+# around this module, scripts can use it directly:
+#
+#   session = SysexSession(midi, progress=lambda result: print(result.num_bytes))
+#   result = session.transmit(midi_util.open_sysex_file('file.syx'))
+
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+from app_config import MIDI_REQUEST_QUIET_SEC, MIDI_REQUEST_TIMEOUT_SEC, MIDI_RX_COMPLETE_SEC
+import midi_util
+
+
+def load_sysex_file(sysex_file):
+    # Open, map and index SYSEX file
+    sysex_buffer = midi_util.open_sysex_file(sysex_file)
+
+    # Check SYSEX data
+    if not sysex_buffer.size:
+        sysex_buffer.close()
+        raise ValueError('No SYEX data found in "{}"'.format(sysex_file))
+    if not sysex_buffer.is_valid():
+        sysex_buffer.close()
+        raise ValueError('Error: Invalid SYSEX data in "{}"'.format(sysex_file))
+
+    return sysex_buffer
+
+
+def check_sysex_files(sysex_files):
+    # Check list of (SYSEX file, delay) is readable and contains SYSEX messages before transmitting the first file.
+    # Files are mapped, indexed and checked like for transmit. Raises OSError or ValueError.
+    for sysex_file, _ in sysex_files:
+        load_sysex_file(sysex_file).close()
+
+
+def iter_sysex_files(sysex_files):
+    # Yield (index, SYSEX file, delay, SYSEX buffer) of list of (SYSEX file, delay after file in seconds)
+    # Next file is read and indexed in the background while the current file is transmitted
+    # Files are closed when the consumer stops early
+    executor = ThreadPoolExecutor(max_workers=1)
+    sysex_buffer = None
+    next_sysex_buffer = executor.submit(load_sysex_file, sysex_files[0][0])
+    try:
+        for i, (sysex_file, delay) in enumerate(sysex_files):
+            sysex_buffer = next_sysex_buffer.result()
+            next_sysex_buffer = None
+            if i + 1 < len(sysex_files):
+                next_sysex_buffer = executor.submit(load_sysex_file, sysex_files[i + 1][0])
+
+            yield i, sysex_file, delay, sysex_buffer
+
+            # Close SYSEX file
+            sysex_buffer.close()
+            sysex_buffer = None
+    finally:
+        if sysex_buffer is not None:
+            sysex_buffer.close()
+        if next_sysex_buffer is not None and not next_sysex_buffer.cancel():
+            # Wait for next file being loaded and close it
+            try:
+                next_sysex_buffer.result().close()
+            except (OSError, ValueError):
+                pass
+        executor.shutdown()
+
+
+class CancelToken:
+    # Thread safe cancellation of one or more sessions
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    def wait(self, timeout):
+        # Sleep until timeout or cancelled, returns True when cancelled
+        return self._event.wait(timeout)
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+
+class SessionResult:
+    def __init__(self):
+        self.num_bytes = 0
+        self.num_messages = 0
+        self.elapsed = 0.0
+        self.cancelled = False
+        self.error = None
+        # Receive completed by dump detector instead of idle timeout
+        self.dump_complete = False
+
+    @property
+    def success(self):
+        return self.error is None and not self.cancelled
+
+    @property
+    def rate(self):
+        # Bytes per second, None when elapsed is shorter than the MIDI transfer time of one message, for example a
+        # reply received in one chunk
+        if not self.num_messages or \
+                self.elapsed < self.num_bytes / self.num_messages * midi_util.MIDI_BYTE_TIME:
+            return None
+        return self.num_bytes / self.elapsed
+
+    def __repr__(self):
+        rate = self.rate
+        return 'SessionResult(num_bytes={}, num_messages={}, elapsed={:.3f}, rate={}, cancelled={}, error={})'.format(
+            self.num_bytes, self.num_messages, self.elapsed, '{:.1f}'.format(rate) if rate is not None else None,
+            self.cancelled, self.error)
+
+
+class SysexSession:
+    def __init__(self, midi, cancel_token=None, progress=None):
+        # MIDI object with opened ports, progress(result) is called after each transmitted or received message
+        self.midi = midi
+        self.cancel_token = cancel_token or CancelToken()
+        self.progress = progress
+        self.sysex_reassembler = midi_util.SysexReassembler()
+        # Echo and NAK replies of adaptive transmit
+        self._verify_reassembler = midi_util.SysexReassembler()
+        self.result = None
+
+    def _update(self, result, t_begin):
+        result.elapsed = time.perf_counter() - t_begin
+        if self.progress:
+            self.progress(result)
+
+    def _transmit_adaptive(self, message, adaptive_rate, adaptive_echo):
+        # Transmit with adaptive rate, retry with slower rate on errors
+        # Rate is raised only by verified messages, unverified messages keep the current rate
+        for _ in range(midi_util.MIDI_ADAPTIVE_RETRIES):
+            self.midi.get_tx_scheduler().baudrate = adaptive_rate.baudrate
+            if not self.midi.send_message(message):
+                raise OSError('MIDI output port not open')
+            verified = midi_util.verify_transmit(self.midi, message, echo=adaptive_echo,
+                                                 sysex_reassembler=self._verify_reassembler)
+            if verified is not False:
+                if verified:
+                    adaptive_rate.on_success()
+                return True
+            adaptive_rate.on_error()
+        return False
+
+    def iter_transmit(self, sysex_buffer, adaptive_rate=None, adaptive_echo=False):
+        # Transmit SYSEX buffer, yields result after each message
+        result = self.result = SessionResult()
+        self._verify_reassembler.reset()
+        t_begin = time.perf_counter()
+
+        for message in sysex_buffer:
+            if self.cancel_token.cancelled:
+                result.cancelled = True
+                break
+
+            try:
+                if adaptive_rate:
+                    if not self._transmit_adaptive(message, adaptive_rate, adaptive_echo):
+                        result.error = 'Transmit failed at {} baud'.format(adaptive_rate.baudrate)
+                        break
+                elif not self.midi.send_message(message):
+                    raise OSError('MIDI output port not open')
+            except OSError as e:
+                result.error = str(e)
+                break
+
+            result.num_messages += 1
+            result.num_bytes += len(message)
+            self._update(result, t_begin)
+            yield result
+
+        result.elapsed = time.perf_counter() - t_begin
+
+    def transmit(self, sysex_buffer, adaptive_rate=None, adaptive_echo=False):
+        for _ in self.iter_transmit(sysex_buffer, adaptive_rate, adaptive_echo):
+            pass
+        return self.result
+
+    def iter_receive(self, sysex_writer=None, complete_timeout=MIDI_RX_COMPLETE_SEC, dump_detector=None,
+                     timeout=None):
+        # Receive SYSEX messages, yields result after each completed message
+        # Completed messages are streamed to sysex_writer, or kept in sysex_reassembler without writer until the next
+        # receive
+        # Receive completes when dump_detector reports a complete dump, when not receiving data for complete_timeout
+        # after first data as fallback, or when cancelled
+        # Receive fails when no SYSEX data received within timeout
+        # Elapsed time is measured from first received SYSEX data until last completed message
+        result = self.result = SessionResult()
+        self.sysex_reassembler.reset()
+        t_begin = 0
+        t_last = 0
+        t_timeout = time.perf_counter() + timeout if timeout else None
+
+        while True:
+            if self.cancel_token.cancelled:
+                result.cancelled = True
+                break
+            if t_timeout and not t_begin and time.perf_counter() > t_timeout:
+                result.error = 'No reply within {:.1f} s'.format(timeout)
+                break
+
+            rx_data = self.midi.receive_message()
+            if rx_data is False:
+                result.error = 'MIDI input port not open'
+                break
+            if rx_data:
+                num_messages = self.sysex_reassembler.feed(rx_data)
+                if num_messages or self.sysex_reassembler.receiving:
+                    # Only SYSEX data starts and extends the timeline, not MIDI clock or other messages
+                    t_last = time.perf_counter()
+                    if not t_begin:
+                        t_begin = t_last
+                if num_messages:
+                    if sysex_writer:
+                        data = self.sysex_reassembler.take()
+                        try:
+                            sysex_writer.write(data)
+                        except OSError as e:
+                            result.error = str(e)
+                            break
+                    elif dump_detector:
+                        data = self.sysex_reassembler.get_data(start=result.num_bytes)
+                    result.num_messages += num_messages
+                    result.num_bytes = self.sysex_reassembler.size
+                    if dump_detector:
+                        result.dump_complete = dump_detector.feed_data(data)
+                    self._update(result, t_begin)
+                    yield result
+                    if result.dump_complete:
+                        break
+
+            if complete_timeout and t_last and (time.perf_counter() - t_last) > complete_timeout:
+                break
+
+    def receive(self, sysex_writer=None, complete_timeout=MIDI_RX_COMPLETE_SEC, dump_detector=None, timeout=None):
+        for _ in self.iter_receive(sysex_writer, complete_timeout, dump_detector, timeout):
+            pass
+        return self.result
+
+    def _discard_input(self, max_time, quiet_time=MIDI_REQUEST_QUIET_SEC):
+        # Discard messages received before a request until input is quiet for quiet_time, so trailing messages of a
+        # previous reply are not stored with the next reply
+        # MIDI clock and other real-time messages do not extend the quiet time, waits at most max_time
+        # Returns False when the input port is not open
+        t_now = time.perf_counter()
+        t_quiet = t_now + quiet_time
+        t_end = t_now + max_time if max_time else t_quiet
+        while t_now < t_quiet and t_now < t_end and not self.cancel_token.cancelled:
+            rx_data = self.midi.receive_message(timeout=min(t_quiet, t_end) - t_now)
+            if rx_data is False:
+                # Input port not open
+                return False
+            t_now = time.perf_counter()
+            if rx_data and any(b < 0xf8 for b in rx_data):
+                t_quiet = t_now + quiet_time
+        return True
+
+    def iter_request(self, request, sysex_writer=None, complete_timeout=MIDI_RX_COMPLETE_SEC, dump_detector=None,
+                     timeout=MIDI_REQUEST_TIMEOUT_SEC):
+        # Send dump request SYSEX message and receive the reply, input port must be opened before the request is sent
+        if not self._discard_input(complete_timeout):
+            result = self.result = SessionResult()
+            result.error = 'MIDI input port not open'
+            return
+        if not self.midi.send_message(request):
+            result = self.result = SessionResult()
+            result.error = 'MIDI output port not open'
+            return
+        yield from self.iter_receive(sysex_writer, complete_timeout, dump_detector, timeout)
+
+    def request(self, request, sysex_writer=None, complete_timeout=MIDI_RX_COMPLETE_SEC, dump_detector=None,
+                timeout=MIDI_REQUEST_TIMEOUT_SEC):
+        for _ in self.iter_request(request, sysex_writer, complete_timeout, dump_detector, timeout):
+            pass
+        return self.result
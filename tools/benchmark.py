@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# Copyright (c) 2023-2024 Erriez
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Source: https://github.com/Erriez/midi-sysex-io
+
+# Benchmark SYSEX hot paths on generated dumps, runs headless. Reports throughput, time per message (per page for
+# rendering) and peak memory and compares with a saved baseline to detect regressions.
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+path_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, path_root)
+
+import midi_util
+import midi_virtual
+import sysex_devices
+
+# Dump sizes in Bytes
+BENCHMARK_SIZES = [1024, 64 * 1024, 1024 * 1024, 10 * 1024 * 1024, 50 * 1024 * 1024]
+
+# Slow verbose paths are only measured up to this dump size
+BENCHMARK_MAX_SIZE_PRINT = 1024 * 1024
+
+# Fragment size of received SYSEX chunks in Bytes
+BENCHMARK_FRAGMENT_SIZE = 256
+
+# Message size distribution: (weight, min size, max size) of parameter changes, data packets and bulk dumps
+BENCHMARK_MESSAGE_SIZES = [
+    (25, 6, 32),
+    (60, 264, 264),
+    (15, 1024, 8192),
+]
+
+# Throughput decrease in percent reported as regression
+BENCHMARK_THRESHOLD = 20
+
+path_baseline = os.path.join(path_root, 'tools', 'benchmark_baseline.json')
+
+
+def generate_dump(size, seed=0):
+    # SYSEX dump of about size Bytes with a fixed message size distribution
+    rng = random.Random(seed)
+    weights = [weight for weight, _, _ in BENCHMARK_MESSAGE_SIZES]
+    max_length = max(max_size for _, _, max_size in BENCHMARK_MESSAGE_SIZES)
+    payload = bytes(rng.getrandbits(7) for _ in range(max_length))
+    data = bytearray()
+    while len(data) < size:
+        _, min_size, max_size = rng.choices(BENCHMARK_MESSAGE_SIZES, weights)[0]
+        length = max(2, min(rng.randint(min_size, max_size), size - len(data)))
+        data += b'\xf0' + payload[:length - 2] + b'\xf7'
+    return bytes(data)
+
+
+def bench_index(path, sysex_buffer):
+    buffer = midi_util.open_sysex_file(path)
+    num_messages = len(buffer)
+    buffer.close()
+    return num_messages
+
+
+def bench_iterate(path, sysex_buffer):
+    num_bytes = 0
+    for message in sysex_buffer:
+        num_bytes += len(message)
+    return len(sysex_buffer)
+
+
+def bench_reassemble(path, sysex_buffer):
+    data = sysex_buffer.data
+    reassembler = midi_util.SysexReassembler()
+    for offset in range(0, len(data), BENCHMARK_FRAGMENT_SIZE):
+        if reassembler.feed(data[offset:offset + BENCHMARK_FRAGMENT_SIZE]):
+            reassembler.take()
+    return reassembler.num_messages
+
+
+def bench_print(path, sysex_buffer):
+    with contextlib.redirect_stdout(io.StringIO()):
+        for message in sysex_buffer:
+            midi_util.print_message('TX', message)
+    return len(sysex_buffer)
+
+
+def bench_statistics(path, sysex_buffer):
+    return len(sysex_devices.SysexStatistics(sysex_buffer).classification)
+
+
+@contextlib.contextmanager
+def virtual_devices(new_devices, new_clock):
+    # Replace virtual backend devices and clock, restored on exit
+    old_devices = list(midi_virtual.devices)
+    old_clock = midi_virtual.clock
+    midi_virtual.devices[:] = new_devices
+    midi_virtual.set_clock(new_clock)
+    try:
+        yield
+    finally:
+        midi_virtual.devices[:] = old_devices
+        midi_virtual.set_clock(old_clock)
+
+
+def bench_virtual_backend(path, sysex_buffer):
+    # Call overhead of the in-process virtual backend only, not of rtmidi or PyGame: virtual clock and device without
+    # wire time, scheduler without delay
+    device = midi_virtual.VirtualDevice('Benchmark', baudrate=1e12, tx_buffer_size=sysex_buffer.size,
+                                        rx_buffer_size=sysex_buffer.size, echo=True)
+    with virtual_devices([device], midi_virtual.VirtualClock()):
+        midi = midi_virtual.MIDI()
+        midi.set_tx_scheduler(midi_util.TransmitScheduler(baudrate=1e12))
+        midi.port_out_open(0)
+        midi.port_in_open(0)
+        for message in sysex_buffer:
+            midi.send_message(message)
+        num_messages = 0
+        while midi.receive_message(timeout=0):
+            num_messages += 1
+        midi.port_in_close()
+        midi.port_out_close()
+    return num_messages
+
+
+def get_hex_view():
+    # Render offscreen, skipped when PySide6 is not installed
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    try:
+        from PySide6.QtWidgets import QApplication
+        from PySide6.QtGui import QImage
+        import hexview
+    except ImportError:
+        return None
+
+    app = QApplication.instance() or QApplication([])
+    view = hexview.SysexHexView()
+    view.resize(800, 600)
+    image = QImage(view.size(), QImage.Format_RGB32)
+    return app, view, image
+
+
+def bench_render(path, sysex_buffer, hex_view=None):
+    # Render a fixed number of pages spread over the dump, returns number of rendered pages
+    _, view, image = hex_view
+    view.set_buffer(sysex_buffer)
+    scroll_bar = view.verticalScrollBar()
+    num_pages = 50
+    for i in range(num_pages):
+        scroll_bar.setValue(scroll_bar.maximum() * i // num_pages)
+        view.render(image)
+    view.clear()
+    return num_pages
+
+
+def bench_copy(path, sysex_buffer, hex_view=None):
+    _, view, _ = hex_view
+    view.set_buffer(sysex_buffer)
+    view.select_all()
+    view.get_selected_text()
+    view.clear()
+    return len(sysex_buffer)
+
+
+def measure(func, args, repeat):
+    # Best time of repeated runs, peak memory of a separate traced run
+    t_best = None
+    for _ in range(repeat):
+        t_begin = time.perf_counter()
+        count = func(*args)
+        t_run = time.perf_counter() - t_begin
+        if t_best is None or t_run < t_best:
+            t_best = t_run
+
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return t_best, count, peak
+
+
+def run(sizes, repeat, cases):
+    hex_view = None
+    if 'render' in cases or 'copy' in cases:
+        hex_view = get_hex_view()
+        if hex_view is None:
+            print('PySide6 not installed, skipping hex view benchmarks')
+
+    results = {}
+    with tempfile.TemporaryDirectory() as path_tmp:
+        for size in sizes:
+            path = os.path.join(path_tmp, 'dump-{}.syx'.format(size))
+            with open(path, 'wb') as f:
+                f.write(generate_dump(size))
+
+            sysex_buffer = midi_util.open_sysex_file(path)
+            for name in cases:
+                func = BENCHMARKS[name]
+                args = (path, sysex_buffer)
+                if name in ('render', 'copy'):
+                    if hex_view is None:
+                        continue
+                    args += (hex_view,)
+                if name == 'print' and size > BENCHMARK_MAX_SIZE_PRINT:
+                    continue
+
+                t_run, count, peak = measure(func, args, repeat)
+                key = '{}/{}'.format(name, size_to_str(size))
+                if name == 'render':
+                    # Time per rendered page instead of per message
+                    results[key] = {
+                        'mb_per_sec': None,
+                        'us_per_op': t_run / count * 1e6,
+                        'peak_kb': peak / 1024,
+                    }
+                else:
+                    results[key] = {
+                        'mb_per_sec': sysex_buffer.size / t_run / 1e6,
+                        'us_per_op': t_run / max(1, len(sysex_buffer)) * 1e6,
+                        'peak_kb': peak / 1024,
+                    }
+                print_result(key, results[key])
+            sysex_buffer.close()
+    return results
+
+
+def size_to_str(size):
+    if size >= 1024 * 1024:
+        return '{}MB'.format(size // (1024 * 1024))
+    return '{}KB'.format(size // 1024)
+
+
+def print_result(key, result):
+    mb_per_sec = result['mb_per_sec']
+    line = '{:28} {:>12} {:>12.2f} us/op {:>12.1f} KB peak'.format(
+        key,
+        '{:.2f} MB/s'.format(mb_per_sec) if mb_per_sec is not None else '',
+        result['us_per_op'],
+        result['peak_kb'])
+    print(line)
+
+
+def compare(results, baseline, threshold):
+    # Regression when time per operation increased more than threshold percent
+    regressions = 0
+    print('\nCompared with baseline:')
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        reference = baseline[key]['us_per_op']
+        change = (result['us_per_op'] - reference) / reference * 100
+        status = ''
+        if change > threshold:
+            status = 'REGRESSION'
+            regressions += 1
+        print('{:28} {:>+8.1f}%  {}'.format(key, change, status))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-s', '--sizes', help='Dump sizes in KB (default: 1 KB to 50 MB)', type=int, nargs='+')
+    parser.add_argument('-c', '--cases', help='Benchmarks (default: all)', nargs='+', choices=list(BENCHMARKS))
+    parser.add_argument('-n', '--repeat', help='Runs per benchmark (default: %(default)s)', type=int, default=3)
+    parser.add_argument('--baseline', help='Baseline file (default: tools/benchmark_baseline.json)',
+                        default=path_baseline)
+    parser.add_argument('--save-baseline', help='Save results as baseline', action='store_true')
+    parser.add_argument('--threshold', help='Regression threshold in percent (default: %(default)s)', type=float,
+                        default=BENCHMARK_THRESHOLD)
+    args = parser.parse_args()
+
+    sizes = [size * 1024 for size in args.sizes] if args.sizes else BENCHMARK_SIZES
+    results = run(sizes, args.repeat, args.cases or list(BENCHMARKS))
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print('\nBaseline saved to "{}"'.format(args.baseline))
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+    else:
+        print('\nNo baseline "{}", not checked for regressions. Create it with --save-baseline.'.format(
+            args.baseline))
+
+
+BENCHMARKS = {
+    'index': bench_index,
+    'iterate': bench_iterate,
+    'reassemble': bench_reassemble,
+    'print': bench_print,
+    'statistics': bench_statistics,
+    'virtual-backend': bench_virtual_backend,
+    'render': bench_render,
+    'copy': bench_copy,
+}
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# Copyright (c) 2023-2024 Erriez
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Source: https://github.com/Erriez/midi-sysex-io
+#
+
+# Check that commandline startup does not import the GUI stack, measured with python -X importtime
+
+import argparse
+import os
+import subprocess
+import sys
+
+# Modules which shall only be imported when starting the GUI or transmitting with progress bar
+FORBIDDEN_MODULES = ['PySide6', 'shiboken6', 'tqdm', 'distro', 'webbrowser', 'gui', 'hexview', 'messagebox']
+
+# Maximum cumulative import time of the commandline entry point
+MAX_IMPORT_TIME_MS = 500
+
+path_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def get_import_times(module):
+    # Each stderr line: "import time: <self us> | <cumulative us> | <indented module name>"
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import {}'.format(module)],
+                            cwd=path_root, capture_output=True, text=True)
+    if result.returncode:
+        print(result.stderr)
+        sys.exit(1)
+
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        import_times[name.strip()] = int(cumulative) / 1000
+    return import_times
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-m', '--module', help='Entry point module (default: %(default)s)', default='main')
+    parser.add_argument('--max-ms', help='Maximum import time in ms (default: %(default)s)', type=float,
+                        default=MAX_IMPORT_TIME_MS)
+    parser.add_argument('-v', '--verbose', help='Print slowest imports', action='store_true')
+    args = parser.parse_args()
+
+    import_times = get_import_times(args.module)
+
+    if args.verbose:
+        for name, cumulative in sorted(import_times.items(), key=lambda item: item[1], reverse=True)[:20]:
+            print('{:10.1f} ms  {}'.format(cumulative, name))
+
+    errors = 0
+    for name in import_times:
+        if name.split('.')[0] in FORBIDDEN_MODULES:
+            print('Error: "{}" imported at startup'.format(name))
+            errors += 1
+
+    total = import_times.get(args.module, 0)
+    print('Import time "{}": {:.1f} ms (max {:.1f} ms)'.format(args.module, total, args.max_ms))
+    if total > args.max_ms:
+        print('Error: Import time exceeded')
+        errors += 1
+
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == '__main__':
+    main()